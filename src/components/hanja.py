@@ -1,11 +1,116 @@
+import os
+import json
+import asyncio
+import sqlite3
+import requests
+from bs4 import BeautifulSoup, SoupStrainer
+from requests.adapters import HTTPAdapter
+from operator import itemgetter
+from contextlib import ExitStack
+from concurrent.futures import ThreadPoolExecutor
 from utils.logger import logger
-from utils.selenium_driver import SeleniumDriver
+from utils.selenium_driver import MAX_BROWSER_WORKERS, driver_pool
 from selenium.webdriver.common.by import By
-from utils.hanja_tool import is_hanja, hanja_to_url, standardize_hanja
-from utils.csv import export_to_csv
+from utils.hanja_tool import filter_hanja, hanja_to_url, standardize_hanja
+from utils.csv import export_to_csv, open_csv_writer
 
 
-def fetch_hanja_data(hanja, browser):
+# Columns of the exported Hanja CSV file
+HANJA_CSV_FIELDNAMES = [
+    "hanja",
+    "meaning_official",
+    "radical",
+    "stroke_count",
+    "formation_letter",
+    "unicode",
+    "usage",
+    "naver_hanja_id",
+]
+
+# Pulls every CSV field out of a Hanja data dictionary in one call
+hanja_csv_fields = itemgetter(*HANJA_CSV_FIELDNAMES)
+
+# Rows of the streamed Hanja CSV are flushed to disk every HANJA_CSV_FLUSH_INTERVAL rows
+HANJA_CSV_FLUSH_INTERVAL = 50
+
+# On-disk SQLite cache of scraped Hanja data keyed by Hanja character
+HANJA_CACHE_PATH = "data/cache/hanja.db"
+
+# Collects every field of the Hanja detail entry in a single execute_script call
+HANJA_ENTRY_SCRIPT = """
+const entry = document.querySelector(".component_entry");
+if (!entry) return null;
+const text = (root, selector) => {
+    const element = root ? root.querySelector(selector) : null;
+    return element ? element.innerText.trim() : null;
+};
+const infos = entry.querySelectorAll(".entry_infos .info_item");
+return {
+    meaning: text(entry, ".entry_title .mean"),
+    radical: text(infos[0], "button"),
+    stroke_count: text(entry, ".entry_infos .stroke span.word"),
+    formation_category: text(infos[1], ".cate"),
+    formation_desc: text(infos[1], ".desc"),
+    unicode: text(entry, ".entry_infos .unicode .desc"),
+    usage: Array.from(
+        entry.querySelectorAll(".entry_condition .unit_tooltip"),
+        (element) => element.innerText.trim()
+    ),
+};
+"""
+
+# Shared HTTP session whose connection pool keeps connections to Naver alive across
+# requests and threads, sized for the concurrent ID lookups in fetch_hanja_list_async
+http_session = requests.Session()
+http_session.headers.update({"User-Agent": "Mozilla/5.0"})
+http_session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=10))
+
+# Only the search result block of the page is parsed into a tree
+SEARCH_RESULT_STRAINER = SoupStrainer(id="searchPage_letter")
+
+
+def fetch_hanja_id_http(hanja, url):
+    """
+    Look up a Hanja ID from the search page over plain HTTP, without a browser.
+
+    :param hanja: The Hanja character to search for.
+    :type hanja: str
+    :param url: The search page URL for the Hanja character.
+    :type url: str
+    :returns: The Hanja ID, or None if it is not present in the served HTML.
+    :rtype: str or None
+    """
+    try:
+        response = http_session.get(url, timeout=5)
+        response.raise_for_status()
+    except requests.RequestException as e:
+        logger.warning(f"HTTP search failed for {hanja}: {e}")
+        return None
+
+    return parse_hanja_id(hanja, response.text)
+
+
+def parse_hanja_id(hanja, html):
+    """
+    Extract the Hanja ID from the HTML of a search page.
+
+    :param hanja: The Hanja character that was searched for.
+    :type hanja: str
+    :param html: The HTML of the search page, or of its search result block.
+    :type html: str
+    :returns: The Hanja ID, or None if the first result is not the searched Hanja.
+    :rtype: str or None
+    """
+    soup = BeautifulSoup(html, "html.parser", parse_only=SEARCH_RESULT_STRAINER)
+    hanja_link = soup.select_one(".row .hanja_word .hanja_link")
+
+    if hanja_link is None or hanja_link.get_text(strip=True) != standardize_hanja(hanja):
+        return None
+
+    return hanja_link.get("href", "").rpartition("/")[2] or None
+
+
+def fetch_hanja_data(hanja, browser, hanja_id=None, lookup_http=True):
     """
     Retrieve Hanja information from the Naver Hanja Dictionary website.
 
@@ -13,6 +118,10 @@ def fetch_hanja_data(hanja, browser):
     :type hanja: str
     :param browser: An instance of the SeleniumDriver class for web automation.
     :type browser: SeleniumDriver
+    :param hanja_id: The Hanja ID if it is already known, which skips the search step.
+    :type hanja_id: str, optional
+    :param lookup_http: If True, try the search over plain HTTP before rendering it in the browser.
+    :type lookup_http: bool, optional
     :returns: A tuple containing Hanja character, its unique ID, and detailed information.
     :rtype: tuple
     """
@@ -20,50 +129,47 @@ def fetch_hanja_data(hanja, browser):
     # Step 1: Fetch Hanja data from the Naver Dictionary website
     encoded_hanja = hanja_to_url(hanja)
     url = f"https://hanja.dict.naver.com/search?query={encoded_hanja}"
-    browser.get_await(url=url, locator=(By.ID, "searchPage_letter"))
 
-    hanja_obj = browser.find_elements(By.CSS_SELECTOR, ".row")[0].find_element(
-        By.CSS_SELECTOR, ".hanja_word .hanja_link"
-    )
+    # Step 2: Extract the Hanja ID, over plain HTTP first and by rendering the page otherwise
+    if hanja_id is None and lookup_http:
+        hanja_id = fetch_hanja_id_http(hanja, url)
 
-    # Step 2: Extract the Hanja ID
-    if hanja_obj.text == standardize_hanja(hanja):
-        hanja_id = hanja_obj.get_attribute("href").split("/")[-1]
-    else:
-        return {"hanja": hanja}
+    if hanja_id is None:
+        browser.get_await(url=url, locator=(By.ID, "searchPage_letter"), timeout=3)
+
+        # Fetch the rendered search result block once and parse it locally
+        search_html = browser.execute_script(
+            "const letter = document.getElementById('searchPage_letter');"
+            "return letter ? letter.outerHTML : '';"
+        )
+        hanja_id = parse_hanja_id(hanja, search_html)
+
+        if hanja_id is None:
+            return {"hanja": hanja}
 
     # Step 3: Access the Detail Webpage with Hanja ID
     detailed_url = f"https://hanja.dict.naver.com/#/entry/ccko/{hanja_id}"
-    browser.get_await(url=detailed_url, locator=(By.CLASS_NAME, "component_entry"))
+    browser.get_hash_await(
+        url=detailed_url, locator=(By.CLASS_NAME, "component_entry")
+    )
 
-    # Step 4: Save WebElements for repetitive calls
-    hanja_entry = browser.find_element(By.CSS_SELECTOR, ".component_entry")
-    hanja_infos = hanja_entry.find_elements(By.CSS_SELECTOR, ".entry_infos .info_item")
+    # Step 4: Scrape every field of the entry in one round-trip to the browser
+    entry_data = browser.execute_script(HANJA_ENTRY_SCRIPT)
+    if entry_data is None:
+        logger.warning(f"{hanja}'s detail page has no entry to scrape.")
+        return {"hanja": hanja}
 
     # Step 5: Extract Hanja Information from web crawling
-    hanja_meaning = hanja_entry.find_element(By.CSS_SELECTOR, ".entry_title .mean").text
-    hanja_radical = hanja_infos[0].find_element(By.TAG_NAME, "button").text
-    hanja_stroke_count = int(
-        hanja_entry.find_element(
-            By.CSS_SELECTOR, ".entry_infos .stroke span.word"
-        ).text[:-1]
-    )
-    if hanja_infos[1].find_element(By.CSS_SELECTOR, ".info_item .cate").text == "모양자":
-        formation_letters = (
-            hanja_infos[1].find_element(By.CSS_SELECTOR, ".desc").text.split(" + ")
-        )
-        formation_letter = tuple(seg[0] for seg in formation_letters)
+    hanja_meaning = entry_data["meaning"]
+    hanja_radical = entry_data["radical"]
+    hanja_stroke_count = int(entry_data["stroke_count"][:-1])
+    if entry_data["formation_category"] == "모양자":
+        formation_letters = entry_data["formation_desc"].split(" + ")
+        formation_letter = "+".join(seg[0] for seg in formation_letters)
     else:
         formation_letter = None
-    unicode = hanja_entry.find_element(
-        By.CSS_SELECTOR, ".entry_infos .unicode .desc"
-    ).text
-    usage = tuple(
-        usage.text
-        for usage in hanja_entry.find_elements(
-            By.CSS_SELECTOR, ".entry_condition .unit_tooltip"
-        )
-    )
+    unicode = entry_data["unicode"]
+    usage = tuple(entry_data["usage"])
     # Step 6: Create a dictionary with Hanja information
     hanja_data = {
         "hanja": hanja,
@@ -79,6 +185,23 @@ def fetch_hanja_data(hanja, browser):
     return hanja_data
 
 
+def hanja_csv_row(hanja_obj):
+    """
+    Convert Hanja data to a CSV row.
+
+    :param hanja_obj: A dictionary containing hanja data.
+    :type hanja_obj: dict
+    :return: A tuple of values ordered like HANJA_CSV_FIELDNAMES, with the usage joined by "·".
+    :rtype: tuple
+    """
+    try:
+        *fields, usage, hanja_id = hanja_csv_fields(hanja_obj)
+    except KeyError:
+        # Failed fetches only carry the Hanja character
+        *fields, usage, hanja_id = map(hanja_obj.get, HANJA_CSV_FIELDNAMES)
+    return (*fields, "·".join(usage) if usage else "", hanja_id)
+
+
 def export_hanja_csv_data(hanja_objs, filename=None):
     """
     Export hanja data to a CSV file.
@@ -91,86 +214,238 @@ def export_hanja_csv_data(hanja_objs, filename=None):
     # Define Keyword
     csv_keyword = "hanja"
 
-    # Define the CSV header
-    fieldnames = [
-        "hanja",
-        "meaning_official",
-        "radical",
-        "stroke_count",
-        "formation_letter",
-        "unicode",
-        "usage",
-        "naver_hanja_id",
-    ]
-
-    # Align data with fieldnames
-    csv_data = []
-    for hanja_item in hanja_objs:
-        csv_data.append(
-            {
-                "hanja": hanja_item["hanja"],
-                "meaning_official": hanja_item["meaning_official"],
-                "radical": hanja_item["radical"],
-                "stroke_count": hanja_item["stroke_count"],
-                "formation_letter": "+".join(hanja_item["formation_letter"]),
-                "unicode": hanja_item["unicode"],
-                "usage": "·".join(hanja_item["usage"]),
-                "naver_hanja_id": hanja_item["naver_hanja_id"],
-            }
-        )
+    # Materialize rows lazily at write time, as tuples aligned with the fieldnames
+    csv_data = map(hanja_csv_row, hanja_objs)
 
     if filename:
-        export_to_csv(fieldnames, csv_data, csv_keyword, filename)
+        export_to_csv(HANJA_CSV_FIELDNAMES, csv_data, csv_keyword, filename, flatten=False)
     else:
-        filename = export_to_csv(fieldnames, csv_data, csv_keyword)
+        filename = export_to_csv(HANJA_CSV_FIELDNAMES, csv_data, csv_keyword, flatten=False)
     logger.info("CSV Export Finished")
 
     return filename
 
 
-def scrape_hanja(hanja_input=None, instant_csv=False):
+async def fetch_hanja_list_async(
+    hanja_list, max_workers=4, max_concurrency=10, on_result=None
+):
+    """
+    Fetch Hanja data for a list of characters concurrently.
+
+    Each character's ID is looked up over plain HTTP, and its detail page is scraped by a browser
+    borrowed from the shared driver pool as soon as the ID is known, so both stages overlap.
+
+    :param hanja_list: The Hanja characters to fetch.
+    :type hanja_list: list
+    :param max_workers: The maximum number of browser sessions scraping in parallel, capped at MAX_BROWSER_WORKERS.
+    :type max_workers: int, optional
+    :param max_concurrency: The maximum number of HTTP lookups in flight at once.
+    :type max_concurrency: int, optional
+    :param on_result: Called with each Hanja character and its data as soon as it is fetched.
+                      It runs on the event loop thread, so calls never overlap.
+    :type on_result: callable, optional
+    :return: A list of Hanja data dictionaries in input order.
+    :rtype: list
+    """
+    loop = asyncio.get_running_loop()
+    http_semaphore = asyncio.Semaphore(max_concurrency)
+    done = 0
+
+    # Each task borrows a browser from the pool and hands it back when done
+    def fetch_with_pooled_browser(hanja, hanja_id):
+        with driver_pool.borrow() as browser:
+            return fetch_hanja_data(hanja, browser, hanja_id, lookup_http=False)
+
+    async def fetch_one(hanja, executor):
+        nonlocal done
+
+        # Resolve the Hanja ID over HTTP so the browser only renders the detail page
+        url = f"https://hanja.dict.naver.com/search?query={hanja_to_url(hanja)}"
+        async with http_semaphore:
+            hanja_id = await asyncio.to_thread(fetch_hanja_id_http, hanja, url)
+
+        hanja_obj = await loop.run_in_executor(
+            executor, fetch_with_pooled_browser, hanja, hanja_id
+        )
+
+        done += 1
+        if hanja_obj.get("naver_hanja_id") is not None:
+            logger.info(f"[{done} / {len(hanja_list)}] {hanja}'s data has been fetched.")
+        else:
+            logger.error(f"[{done} / {len(hanja_list)}] Fetch Failed: {hanja}'")
+        if on_result is not None:
+            on_result(hanja, hanja_obj)
+        return hanja_obj
+
+    # Bound the number of browsers to avoid being rate-limited by Naver
+    num_workers = max(1, min(max_workers, MAX_BROWSER_WORKERS, len(hanja_list)))
+    with ThreadPoolExecutor(max_workers=num_workers) as executor:
+        # gather returns the results in input order
+        return await asyncio.gather(*(fetch_one(hanja, executor) for hanja in hanja_list))
+
+
+def load_cached_hanja(cache_conn, hanja_list):
+    """
+    Load the cached data of the given Hanja characters with batched IN queries.
+
+    :param cache_conn: A connection to the Hanja cache database.
+    :type cache_conn: sqlite3.Connection
+    :param hanja_list: The Hanja characters to look up.
+    :type hanja_list: list
+    :return: A dictionary of Hanja data keyed by the Hanja characters found in the cache.
+    :rtype: dict
+    """
+    cache_conn.execute(
+        "CREATE TABLE IF NOT EXISTS hanja_cache (hanja TEXT PRIMARY KEY, naver_hanja_id TEXT, data TEXT)"
+    )
+
+    cached = {}
+    # Stay below SQLite's limit on the number of query parameters
+    for start in range(0, len(hanja_list), 500):
+        batch = hanja_list[start : start + 500]
+        placeholders = ", ".join("?" for _ in batch)
+        for hanja, data in cache_conn.execute(
+            f"SELECT hanja, data FROM hanja_cache WHERE hanja IN ({placeholders})",
+            batch,
+        ):
+            hanja_obj = json.loads(data)
+            # JSON has no tuples, so restore the usage tuple built by fetch_hanja_data
+            hanja_obj["usage"] = tuple(hanja_obj["usage"])
+            cached[hanja] = hanja_obj
+
+    return cached
+
+
+def store_cached_hanja(cache_conn, hanja_objs):
+    """
+    Store successfully fetched Hanja data in the cache, replacing older entries.
+
+    :param cache_conn: A connection to the Hanja cache database.
+    :type cache_conn: sqlite3.Connection
+    :param hanja_objs: Hanja data dictionaries as returned by fetch_hanja_data.
+    :type hanja_objs: iterable
+    """
+    cache_conn.executemany(
+        "INSERT OR REPLACE INTO hanja_cache (hanja, naver_hanja_id, data) VALUES (?, ?, ?)",
+        (
+            (
+                hanja_obj["hanja"],
+                hanja_obj["naver_hanja_id"],
+                json.dumps(hanja_obj, ensure_ascii=False),
+            )
+            for hanja_obj in hanja_objs
+            if hanja_obj.get("naver_hanja_id") is not None
+        ),
+    )
+
+
+def fetch_hanja_list(hanja_list, max_workers=4, on_result=None):
+    """
+    Fetch Hanja data for a list of characters concurrently.
+
+    Synchronous entry point for fetch_hanja_list_async.
+
+    :param hanja_list: The Hanja characters to fetch.
+    :type hanja_list: list
+    :param max_workers: The maximum number of browser sessions scraping in parallel, capped at MAX_BROWSER_WORKERS.
+    :type max_workers: int, optional
+    :param on_result: Called with each Hanja character and its data as soon as it is fetched.
+    :type on_result: callable, optional
+    :return: A list of Hanja data dictionaries in input order.
+    :rtype: list
+    """
+    return asyncio.run(
+        fetch_hanja_list_async(hanja_list, max_workers, on_result=on_result)
+    )
+
+
+def scrape_hanja(hanja_input=None, instant_csv=False, max_workers=4):
     """
     Scrape Hanja data from the Naver Hanja Dictionary website.
 
+    Each distinct character is scraped once, and successfully fetched data is kept in
+    an on-disk cache so later runs skip characters that were already scraped.
+    With instant_csv, rows are written to the CSV file in input order as soon as they are fetched.
+
     :param hanja_input: The Hanja characters to search for, either as a string or a list.
     :type hanja_input: str or list, optional
     :param instant_csv: If True, export the data to a CSV file instantly, else return the results.
     :type instant_csv: bool, optional
+    :param max_workers: The maximum number of browser sessions scraping in parallel.
+    :type max_workers: int, optional
     :return: A list of Hanja data tuples or None if instant_csv is True.
     :rtype: list or None
     """
 
-    # Create a SeleniumDriver instance with common options
-    with SeleniumDriver() as browser:
-        # Create an empty list to store the hanja_objs
-        hanja_objs = []
+    # Handle various input formats(console, str, list)
+    if hanja_input is None:
+        hanja_input = input("Enter Hanja characters: ")
+    if isinstance(hanja_input, str):
+        hanja_input = list(filter_hanja(hanja_input))
+    if isinstance(hanja_input, list):
+        hanja_list = hanja_input
+    else:
+        raise ValueError("Invalid hanja_input format")
 
-        # Handle various input formats(console, str, list)
-        if hanja_input is None:
-            hanja_input = input("Enter Hanja characters: ")
-        if isinstance(hanja_input, str):
-            hanja_input = [char for char in hanja_input if is_hanja(char)]
-        if isinstance(hanja_input, list):
-            hanja_list = hanja_input
-        else:
-            raise ValueError("Invalid hanja_input format")
-
-        # Iterate through the list of Hanja characters and fetch their data
-        for idx, hanja in enumerate(hanja_list, 1):
-            hanja_obj = fetch_hanja_data(hanja, browser)
-            hanja_objs.append(hanja_obj)
-            if hanja_obj["naver_hanja_id"] != None:
-                logger.info(
-                    f"[{idx} / {len(hanja_list)}] {hanja}'s data has been fetched."
+    # Remove duplicated characters while preserving the input order
+    unique_hanja = list(dict.fromkeys(hanja_list))
+    if len(unique_hanja) < len(hanja_list):
+        logger.info(
+            f"{len(hanja_list) - len(unique_hanja)} duplicated Hanja will be scraped once."
+        )
+
+    os.makedirs(os.path.dirname(HANJA_CACHE_PATH), exist_ok=True)
+    cache_conn = sqlite3.connect(HANJA_CACHE_PATH)
+    try:
+        # Commit the newly scraped data when the block ends without errors
+        with cache_conn, ExitStack() as stack:
+            # Only scrape the characters missing from the cache
+            fetched = load_cached_hanja(cache_conn, unique_hanja)
+            pending_hanja = [hanja for hanja in unique_hanja if hanja not in fetched]
+            if fetched:
+                logger.info(f"{len(fetched)} Hanja loaded from cache.")
+
+            on_result = None
+            if instant_csv == True:
+                csvwriter, csvfile, filename = stack.enter_context(
+                    open_csv_writer(HANJA_CSV_FIELDNAMES, "hanja")
                 )
-            else:
-                logger.error(f"[{idx} / {len(hanja_list)}] Fetch Failed: {hanja}'")
+                written = 0
 
-        # Close the browser session to relase resources
-        logger.info("WebCrawling Finished.")
+                # Write rows in input order as soon as every earlier row is available
+                def on_result(hanja=None, hanja_obj=None):
+                    nonlocal written
+                    if hanja is not None:
+                        fetched[hanja] = hanja_obj
+                    while written < len(hanja_list) and hanja_list[written] in fetched:
+                        csvwriter.writerow(hanja_csv_row(fetched[hanja_list[written]]))
+                        written += 1
+                        if written % HANJA_CSV_FLUSH_INTERVAL == 0:
+                            csvfile.flush()
+
+                # Rows served from the cache can be written right away
+                on_result()
+
+            if pending_hanja:
+                scraped = dict(
+                    zip(
+                        pending_hanja,
+                        fetch_hanja_list(pending_hanja, max_workers, on_result),
+                    )
+                )
+                fetched.update(scraped)
+                store_cached_hanja(cache_conn, scraped.values())
+    finally:
+        cache_conn.close()
+
+    logger.info("WebCrawling Finished.")
 
     if instant_csv == True:
-        return export_hanja_csv_data(hanja_objs)
+        logger.info("CSV Export Finished")
+        return filename
+
+    # Expand the results back to the input list, copying so entries stay independent
+    hanja_objs = [dict(fetched[hanja]) for hanja in hanja_list]
 
     return hanja_objs
 
@@ -1,33 +1,44 @@
-import os, re
+import os, re, mmap, itertools
+from operator import itemgetter
 from components.hanja import scrape_hanja
 from components.word import scrape_multiple_words
 from utils.logger import logger
 from utils.anki_utils import create_anki_tags
 
 
-def parse_data_by_regex(data, patterns):
+# Run of blank lines between the entries of an input file, tolerating "\r\n" and whitespace-only lines
+CHUNK_SEPARATOR = re.compile(rb"\r?\n(?:[ \t]*\r?\n)+")
+
+
+# Number of characters read at a time when a file is streamed in text mode
+READ_BLOCK_SIZE = 1 << 16
+
+# Tokens of a regex source: escapes, character classes, group names ("(?P<name>" or "(?P=name)"),
+# conditionals and single characters. Escaped text and classes are single tokens, so "\(?P<x"
+# or "[(?P<x]" are never taken for a group name
+REGEX_TOKEN = re.compile(
+    r"\\.|\[\^?\]?(?:\\.|[^\]\\])*\]|\(\?P[<=]\w+|\(\?\(|.", re.DOTALL
+)
+
+
+def compile_patterns(patterns):
     """
-    Parse data using regular expressions based on given patterns.
+    Compile the patterns once so they can be reused for every chunk.
 
     Args:
-        data (str): The input data to be parsed.
-        patterns (list): List of patterns for extracting information.
+        patterns (list): List of regex strings or (regex, delimiter) tuples.
 
     Returns:
-        dict: A dictionary containing extracted information.
+        list: List of compiled patterns or (compiled pattern, delimiter) tuples.
 
     Raises:
         ValueError: If an invalid pattern or datatype is encountered.
     """
-    result = {}
-    lines = data.strip().split("\n")
+    compiled_patterns = []
 
     for i, pattern in enumerate(patterns):
-        # Handle single string pattern
-        if isinstance(pattern, str):
-            match = re.match(pattern, lines[i])
-            if match:
-                result.update(match.groupdict())
+        if isinstance(pattern, (str, re.Pattern)):
+            compiled_patterns.append(re.compile(pattern))
         elif isinstance(pattern, tuple):
             # Handle tuple pattern with regex, delimiter
             regex, delimiter, *rest = pattern
@@ -35,48 +46,267 @@ def parse_data_by_regex(data, patterns):
                 raise ValueError(
                     f"Invalid number of elements in tuple pattern at index {i}. Expected 2, got {len(pattern)}"
                 )
-            match = re.match(regex, lines[i])
-            if match:
-                result.update(match.groupdict())
-                key = list(match.groupdict().keys())[0]
-                if key in result:
-                    result[key] = result[key].split(delimiter)
+            compiled_patterns.append((re.compile(regex), delimiter))
         else:
             raise ValueError(f"Invalid datatype for pattern at index {i}")
 
+    return compiled_patterns
+
+
+def combine_patterns(compiled_patterns):
+    """
+    Fuse the per-line patterns into a single regex that parses a whole chunk in one match.
+
+    Each pattern also swallows the rest of its line, and its named groups are renamed with
+    the line index so the same field name may appear on several lines. Patterns with numbered
+    backreferences or conditionals are not fused, as group numbers shift once lines are joined.
+
+    Args:
+        compiled_patterns (list): List of compiled patterns from compile_patterns.
+
+    Returns:
+        tuple or None: The combined pattern and a list of (field name, group name, delimiter) tuples
+            in the order the fields are filled, or None if the patterns cannot be fused.
+    """
+    parts = []
+    fields = []
+
+    for i, pattern in enumerate(compiled_patterns):
+        regex, delimiter = pattern if isinstance(pattern, tuple) else (pattern, None)
+        # Flags set on a single pattern cannot be carried over to the combined one
+        if regex.flags & ~re.UNICODE:
+            return None
+
+        tokens = REGEX_TOKEN.findall(regex.pattern)
+
+        # Numbered backreferences and conditionals would point at the groups of earlier lines
+        for token in tokens:
+            if token == "(?(" or (token[0] == "\\" and token[1] in "123456789"):
+                return None
+
+        # Prefix the group names and backreferences of this line with its index
+        source = "".join(
+            f"{token[:4]}_{i}_{token[4:]}" if token.startswith(("(?P<", "(?P=")) else token
+            for token in tokens
+        )
+
+        # The renamed pattern must hold the same groups under the new names, otherwise keep it unfused
+        try:
+            renamed_groups = re.compile(source).groupindex
+        except re.error:
+            return None
+        expected_groups = {
+            f"_{i}_{name}": index for name, index in regex.groupindex.items()
+        }
+        if renamed_groups != expected_groups:
+            return None
+
+        parts.append(f"(?:{source})[^\\n]*")
+
+        # Only the first group of a tuple pattern is split by its delimiter
+        names = sorted(regex.groupindex, key=regex.groupindex.get)
+        for j, name in enumerate(names):
+            fields.append((name, f"_{i}_{name}", delimiter if j == 0 else None))
+
+    try:
+        # MULTILINE keeps "^" and "$" anchored to lines like the per-line match does
+        return re.compile("\n".join(parts), re.MULTILINE), fields
+    except re.error:
+        return None
+
+
+def parse_data_by_regex(data, patterns, combined=None):
+    """
+    Parse data using regular expressions based on given patterns.
+
+    Args:
+        data (str): The input data to be parsed.
+        patterns (list): List of compiled patterns from compile_patterns.
+        combined (tuple, optional): Fused pattern and fields from combine_patterns. Defaults to None.
+
+    Returns:
+        dict: A dictionary containing extracted information.
+    """
+    if combined is not None:
+        combined_pattern, fields = combined
+        match = combined_pattern.match(data.strip())
+        # Only the newlines joining the lines may be matched, otherwise a field ran into the next line
+        if match and match.group().count("\n") == len(patterns) - 1:
+            result = {}
+            for key, group, delimiter in fields:
+                value = match.group(group)
+                result[key] = value if delimiter is None else value.split(delimiter)
+            return result
+
+    # Fall back to matching line by line, which tolerates lines that fail to match
+    return parse_lines_by_regex(data, patterns)
+
+
+def parse_lines_by_regex(data, patterns):
+    """
+    Parse data by matching each pattern against its own line.
+
+    Args:
+        data (str): The input data to be parsed.
+        patterns (list): List of compiled patterns from compile_patterns.
+
+    Returns:
+        dict: A dictionary containing extracted information.
+    """
+    result = {}
+    lines = data.strip().split("\n")
+
+    for i, pattern in enumerate(patterns):
+        if isinstance(pattern, tuple):
+            # Handle tuple pattern with regex, delimiter
+            regex, delimiter = pattern
+            match = regex.match(lines[i])
+            if match:
+                groups = match.groupdict()
+                result.update(groups)
+                # The first group holds the delimited values
+                key = next(iter(groups))
+                result[key] = result[key].split(delimiter)
+        else:
+            # Handle single pattern
+            match = pattern.match(lines[i])
+            if match:
+                result.update(match.groupdict())
+
     return result
 
 
-def process_txt_file(file_path, patterns, delimiter="\n\n"):
+def iter_txt_chunks(file_path, delimiter="\n\n"):
     """
-    Read a text file, process it using specified patterns, and extract data into dictionaries.
+    Yield the chunks of a UTF-8 text file split by delimiter.
+
+    The file is memory-mapped and scanned for the delimiter, so only one chunk is decoded at a time
+    instead of holding the whole content and its split copy in memory.
+    With the default delimiter, chunks are split on any run of blank lines, tolerating "\r\n" line
+    endings and whitespace-only lines, and blank chunks are skipped.
+
+    Args:
+        file_path (str): The path to the text file.
+        delimiter (str, optional): The delimiter separating the chunks. Defaults to "\n\n".
+
+    Yields:
+        str: Each chunk of the file, in order.
+    """
+    with open(file_path, "rb") as file:
+        # An empty file cannot be mapped, and splits into a single empty chunk
+        if os.fstat(file.fileno()).st_size == 0:
+            if delimiter != "\n\n":
+                yield ""
+            return
+
+        # Chunks are decoded straight from memoryview slices of the map, without copying them to bytes first
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(
+            mm
+        ) as view:
+            has_carriage_return = mm.find(b"\r") != -1
+
+            if delimiter == "\n\n":
+
+                def decode(start, end):
+                    text = str(view[start:end], "utf-8")
+                    # Match text mode, which reads "\r\n" line endings as "\n"
+                    return text.replace("\r\n", "\n") if has_carriage_return else text
+
+                start = 0
+                for separator in CHUNK_SEPARATOR.finditer(mm):
+                    chunk = decode(start, separator.start())
+                    if chunk.strip():
+                        yield chunk
+                    start = separator.end()
+                chunk = decode(start, len(mm))
+                if chunk.strip():
+                    yield chunk
+                return
+
+            if not has_carriage_return:
+                separator = delimiter.encode("utf-8")
+                start = 0
+                while (end := mm.find(separator, start)) != -1:
+                    yield str(view[start:end], "utf-8")
+                    start = end + len(separator)
+                yield str(view[start:], "utf-8")
+                return
+
+    # Leave "\r\n" line endings to text mode, which translates them to "\n",
+    # reading in blocks so the whole file is never held in memory
+    with open(file_path, "r", encoding="utf-8") as file:
+        remainder = ""
+        while block := file.read(READ_BLOCK_SIZE):
+            *chunks, remainder = (remainder + block).split(delimiter)
+            yield from chunks
+        yield remainder
+
+
+def iter_txt_file(file_path, patterns, delimiter="\n\n", required_literal=None):
+    """
+    Read a text file and lazily yield the data extracted from each chunk using specified patterns.
+
+    Only one chunk is held in memory at a time, so large files can be streamed straight into
+    a consumer such as export_to_csv.
 
     Args:
         file_path (str): The path to the text file.
         patterns (list): List of patterns for extracting information.
         delimiter (str, optional): The delimiter used to split the content of the file. Defaults to "\n\n".
+        required_literal (str, optional): A substring every valid chunk contains. Chunks without it
+            are skipped before any regex runs. Defaults to None.
 
-    Returns:
-        list: List of dictionaries containing processed data.
+    Yields:
+        dict: A dictionary containing the data of each chunk, in file order.
     """
     # Check if file path is relative, if so, join it with default input directory
     if not file_path.startswith("data/input/"):
         file_path = os.path.join("data/input", file_path)
 
-    # Read txt file in UTF-8
-    with open(file_path, "r", encoding="utf-8") as file:
-        content = file.read()
+    # Compile the patterns once instead of once per chunk
+    compiled_patterns = compile_patterns(patterns)
+    combined = combine_patterns(compiled_patterns)
 
-    # Split content into chunks based on delimiter
-    chunks = content.split(delimiter)
-    processed_data = []
+    # The first parsed chunk checks the fused pattern against matching line by line
+    is_combined_checked = combined is None
 
     # Process each chunk and extract data into dictionaries using specified patterns
-    for chunk in chunks:
-        entry = parse_data_by_regex(chunk, patterns)
-        processed_data.append(entry)
+    for chunk in iter_txt_chunks(file_path, delimiter):
+        # A plain substring search is enough to rule out malformed chunks
+        if required_literal and required_literal not in chunk:
+            logger.warning(f"Skipped chunk without {required_literal!r}: {chunk.strip()[:20]!r}")
+            continue
+
+        entry = parse_data_by_regex(chunk, compiled_patterns, combined)
+
+        if not is_combined_checked:
+            is_combined_checked = True
+            line_entry = parse_lines_by_regex(chunk, compiled_patterns)
+            if entry != line_entry:
+                logger.warning(
+                    "Fused patterns disagree with line-by-line parsing, parsing line by line instead"
+                )
+                combined = None
+                entry = line_entry
+
+        yield entry
+
 
-    return processed_data
+def process_txt_file(file_path, patterns, delimiter="\n\n", required_literal=None):
+    """
+    Read a text file, process it using specified patterns, and extract data into dictionaries.
+
+    Args:
+        file_path (str): The path to the text file.
+        patterns (list): List of patterns for extracting information.
+        delimiter (str, optional): The delimiter used to split the content of the file. Defaults to "\n\n".
+        required_literal (str, optional): A substring every valid chunk contains. Chunks without it
+            are skipped before any regex runs. Defaults to None.
+
+    Returns:
+        list: List of dictionaries containing processed data.
+    """
+    return list(iter_txt_file(file_path, patterns, delimiter, required_literal))
 
 
 def scrape_data(input_data):
@@ -118,23 +348,49 @@ def apply_modifiers(data, modifiers):
     if not modifiers:
         return data
 
-    for modifier in modifiers:
-        try:
-            # Check if the modifier is a tuple containing a function and a column name
-            if isinstance(modifier, tuple):
-                # Apply the modifier function to each entry in the data
+    def log_modifier_error(modifier, e, entry=None):
+        logger.warning(
+            f"Error occurred in modifier: {modifier.__name__ if callable(modifier) else modifier}, {e}"
+        )
+        if entry is not None:
+            logger.warning(f"Error in entry: {entry}")
+
+    # Group consecutive modifiers by kind so the order between column and dataset modifiers is kept
+    for is_column_group, group in itertools.groupby(
+        modifiers, key=lambda modifier: isinstance(modifier, tuple)
+    ):
+        if not is_column_group:
+            # A single function is applied to the entire data
+            for modifier in group:
+                try:
+                    data = modifier(data)
+                except Exception as e:
+                    log_modifier_error(modifier, e)
+            continue
+
+        # Unpack each (function, column name) tuple once instead of once per entry
+        column_modifiers = []
+        for modifier in group:
+            try:
                 func, column = modifier
-                for entry in data:
-                    if column in entry:
-                        entry[column] = func(entry[column])
+            except ValueError as e:
+                log_modifier_error(modifier, e)
             else:
-                # If the modifier is not a tuple, assume it's a single function and apply it to the entire data
-                data = modifier(data)
-        except Exception as e:
-            logger.warning(
-                f"Error occurred in modifier: {modifier.__name__ if callable(modifier) else modifier}, {e}"
-            )
-            logger.warning(f"Error in entry: {entry}")
+                column_modifiers.append((modifier, func, column))
+
+        # Apply the whole chain of column modifiers in a single pass over the entries
+        for entry in data:
+            failed = []
+            for modifier, func, column in column_modifiers:
+                if column in entry:
+                    try:
+                        entry[column] = func(entry[column])
+                    except Exception as e:
+                        log_modifier_error(modifier, e, entry)
+                        failed.append(modifier)
+            # A failing modifier is not applied to the remaining entries
+            if failed:
+                column_modifiers = [item for item in column_modifiers if item[0] not in failed]
 
     return data
 
@@ -150,22 +406,17 @@ def merge_list_of_dicts(data1, data2):
     Returns:
         list: A list containing merged dictionaries.
     """
-    merged_list = []
 
-    for entry1, entry2 in zip(data1, data2):
-        merged_dict = entry1.copy()
+    def merge_entries(entry1, entry2):
+        # Values from data2 win, except where data1 holds a list for the same key
+        merged_dict = {**entry1, **entry2}
 
-        for key, value in entry2.items():
-            if key in merged_dict:
-                if isinstance(merged_dict[key], list):
-                    merged_dict[key] = merged_dict[key][0]
-                else:
-                    merged_dict[key] = value
-            else:
-                merged_dict[key] = value
-        merged_list.append(merged_dict)
+        for key in entry1.keys() & entry2.keys():
+            if isinstance(entry1[key], list):
+                merged_dict[key] = entry1[key][0]
+        return merged_dict
 
-    return merged_list
+    return [merge_entries(entry1, entry2) for entry1, entry2 in zip(data1, data2)]
 
 
 def arrange_dict_order(data, key_order):
@@ -174,19 +425,29 @@ def arrange_dict_order(data, key_order):
 
     Args:
         data (list): The list of dictionaries to be arranged.
-        key_order (list): The desired order of keys.
+        key_order (tuple or list): The desired order of keys.
 
     Returns:
         list: A list of dictionaries with keys arranged according to key_order.
     """
-    arranged_data = []
-
-    for entry in data:
-        # Create a new dictionary with keys arranged according to key_order
-        new_entry = {key: entry[key] for key in key_order if key in entry}
-        arranged_data.append(new_entry)
-
-    return arranged_data
+    if not data:
+        return []
+
+    # Entries usually share the keys of the first entry, so its ordered keys are looked up once
+    first_keys = data[0].keys()
+    present_keys = tuple(key for key in key_order if key in first_keys)
+    if len(present_keys) < 2:
+        # itemgetter with a single key returns a bare value instead of a tuple
+        return [{key: entry[key] for key in key_order if key in entry} for entry in data]
+    get_present = itemgetter(*present_keys)
+
+    # Create a new dictionary for each entry with keys arranged according to key_order
+    return [
+        dict(zip(present_keys, get_present(entry)))
+        if entry.keys() == first_keys
+        else {key: entry[key] for key in key_order if key in entry}
+        for entry in data
+    ]
 
 
 def process_hanja_txt(
@@ -196,6 +457,7 @@ def process_hanja_txt(
     word_entry,
     hanja_modifiers=None,
     words_modifiers=None,
+    required_literal=None,
 ):
     """
     Process a text file, extract and merge data, and apply modifiers.
@@ -203,23 +465,25 @@ def process_hanja_txt(
     Args:
         file_path (str): The path to the text file.
         patterns (list): List of patterns for extracting information.
-        hanja_entry (str): Pipe-separated list of entry keys.
-        word_entry (str): Pipe-separated list of entry keys for words.
+        hanja_entry (str or tuple): Pipe-separated list of entry keys, or a tuple of the keys.
+        word_entry (str or tuple): Pipe-separated list of entry keys for words, or a tuple of the keys.
         hanja_modifiers (list, optional): List of modifier functions for hanja data.
         words_modifiers (list, optional): List of modifier functions for words data.
+        required_literal (str, optional): A substring every valid chunk contains. Defaults to None.
 
     Returns:
         tuple: A tuple containing processed hanja and words data.
     """
 
-    # Initialize dictionaries for hanja and words entry keys
-    hanja_entry = {key: None for key in hanja_entry.split("|")}
-    word_entry = {key: None for key in word_entry.split("|")}
+    # Split the hanja and words entry keys, which are only used for their order
+    hanja_keys = tuple(hanja_entry.split("|")) if isinstance(hanja_entry, str) else hanja_entry
+    word_keys = tuple(word_entry.split("|")) if isinstance(word_entry, str) else word_entry
 
     # Read the text file and extract information based on patterns
     input_hanja = process_txt_file(
         file_path=file_path,
         patterns=patterns,
+        required_literal=required_literal,
     )
 
     ## Before Scrapping, check hanja is stored in DB
@@ -229,7 +493,7 @@ def process_hanja_txt(
     hanja_data = apply_modifiers(hanja_data, hanja_modifiers)
     hanja_data = create_anki_tags(
         data=hanja_data,
-        tag_template="{{'{}': ['{}', {{'{}': '{}'}}]}}",
+        tag_template='{{"{}": ["{}", {{"{}": "{}"}}]}}',
         values=("漢字", "{rank}", "暗記博士1", "{reference_idx}"),
     )
 
@@ -238,12 +502,12 @@ def process_hanja_txt(
     scrapped_words = apply_modifiers(scrapped_words, words_modifiers)
     scrapped_words = create_anki_tags(
         data=scrapped_words,
-        tag_template="{{'{}': {{'{}': '{}'}}}}",
+        tag_template='{{"{}": {{"{}": "{}"}}}}',
         values=("漢字語", "暗記博士1", "{reference_idx}"),
     )
 
     # Arrange dictionary order for hanja and words data
-    hanja_data = arrange_dict_order(hanja_data, hanja_entry)
-    scrapped_words = arrange_dict_order(scrapped_words, word_entry)
+    hanja_data = arrange_dict_order(hanja_data, hanja_keys)
+    scrapped_words = arrange_dict_order(scrapped_words, word_keys)
 
     return (hanja_data, scrapped_words)
@@ -1,13 +1,85 @@
+import os
+import re
+import html
+import json
+import sqlite3
 from bs4 import BeautifulSoup
 from selenium.webdriver.common.by import By
-from selenium.common.exceptions import NoSuchElementException
 from utils.logger import logger
-from utils.selenium_driver import SeleniumDriver
+from concurrent.futures import ThreadPoolExecutor
+from utils.selenium_driver import MAX_BROWSER_WORKERS, SeleniumDriver, driver_pool
 from utils.hanja_tool import is_hanja, hanja_to_url
 from utils.word_utils import filter_by_word_length, is_single_word
 from utils.csv import export_to_csv
 
 
+# On-disk SQLite cache of scraped word data keyed by Hanja character and Korean word
+WORD_CACHE_PATH = "data/cache/word.db"
+
+
+# Any HTML tag, e.g. the <b> highlighting the word in an example sentence
+HTML_TAG = re.compile(r"<[^>]*>")
+
+# Collects the meaning and origin text of every word candidate on the search page,
+# or null if the page has no word entries
+WORD_CANDIDATES_SCRIPT = """
+const entry = document.getElementById("searchPage_entry");
+if (!entry) return null;
+const text = (root, selector) => {
+    const element = root.querySelector(selector);
+    return element ? element.innerText.trim() : null;
+};
+return Array.from(entry.querySelectorAll(".row"), (row) => ({
+    mean: text(row, ".mean"),
+    origin: text(row, ".origin a"),
+}));
+"""
+
+# Collects the derived words, meanings and examples of a word entry in a single execute_script call
+WORD_ENTRY_SCRIPT = """
+const text = (root, selector) => {
+    const element = root.querySelector(selector);
+    return element ? element.innerText.trim() : null;
+};
+const info = document.querySelector(".component_entry .entry_infos dl.entry_default");
+const hasDerived = info !== null && text(info, "dt") === "파생어";
+return {
+    derived_hrefs: hasDerived ? Array.from(info.querySelectorAll("dd a"), (a) => a.href) : [],
+    mean_items: Array.from(
+        document.querySelectorAll(".mean_tray ul.mean_list li.mean_item"),
+        (item) => ({
+            meanings: Array.from(item.querySelectorAll(".mean_desc .cont"), (cont) => ({
+                mean: text(cont, "span.mean"),
+                addition: text(cont, "span.mean_addition"),
+            })),
+            examples: Array.from(
+                item.querySelectorAll(".example .example_item p.origin span.text"),
+                (example) => example.innerHTML
+            ),
+        })
+    ),
+};
+"""
+
+
+def html_to_text(html_fragment):
+    """
+    Extract the text of a small HTML fragment, such as an example sentence with <b> highlights.
+
+    Tags are stripped with a regex and entities unescaped, which is much cheaper than building
+    a BeautifulSoup tree. Fragments with comments, scripts or styles still go through BeautifulSoup.
+
+    Args:
+        html_fragment (str): The inner HTML to extract the text from.
+
+    Returns:
+        str: The text content of the fragment.
+    """
+    if "<!" in html_fragment or "<script" in html_fragment or "<style" in html_fragment:
+        return BeautifulSoup(html_fragment, "html.parser").get_text()
+    return html.unescape(HTML_TAG.sub("", html_fragment))
+
+
 def match_word_to_hanja(hanja, word, browser):
     """
     Fetch word data from Naver dictionary for a given Hanja and Korean word.
@@ -26,31 +98,29 @@ def match_word_to_hanja(hanja, word, browser):
     # Navigate to the URL using SeleniumDriver
     browser.get_await(url=url, locator=(By.CSS_SELECTOR, "#content .section"))
 
-    try:
-        # Check if the search page entry exists
-        browser.find_element(By.ID, "searchPage_entry")
-    except NoSuchElementException:
+    # Read every word candidate in a single round-trip instead of one per element
+    word_candids = browser.execute_script(WORD_CANDIDATES_SCRIPT)
+
+    # Check if the search page entry exists
+    if word_candids is None:
         logger.warning(f"{word} doesn't exist in naver dictionary")
         return
 
-    # Find elements representing word candidates
-    word_candids = browser.find_elements(By.CSS_SELECTOR, "#searchPage_entry .row")
     word_pairs = []
+    candid_name = None
 
     for candid in word_candids:
         # Check if the meaning matches the word
-        candid_name = candid.find_element(By.CSS_SELECTOR, ".mean").text
+        candid_name = candid["mean"]
         if candid_name != word:
             continue
 
         # Extract Hanja and Korean word pairs
-        wordhanja = candid.find_element(By.CSS_SELECTOR, ".origin a").text
-        if hanja in wordhanja:
-            if "(" in wordhanja:
-                wordhanja = wordhanja.split("(")[0].strip()
+        wordhanja = candid["origin"]
+        if wordhanja is not None and hanja in wordhanja:
             word_pairs.append(
                 {
-                    "hanja": wordhanja,
+                    "hanja": wordhanja.partition("(")[0].strip(),
                     "korean": word,
                 }
             )
@@ -94,18 +164,20 @@ def fetch_word_id(word_pair, browser):
         .text
     )
 
-    if keyword.split(" ")[0] != word_pair["korean"]:
+    # The keyword may carry a homonym index after the word, e.g. "사기 2"
+    keyword_word, separator, _ = keyword.partition(" ")
+    if keyword_word != word_pair["korean"]:
         logger.warning(f"Cannot fetch {word_pair['hanja']}'s word id.")
         return
 
-    if len(keyword.split(" ")) > 1:
+    if separator:
         word_pair["korean"] = keyword
 
     # Extract the word ID from the URL
     word_id = (
         browser.find_element(By.CSS_SELECTOR, ".component_keyword .row .origin a")
         .get_attribute("href")
-        .split("/")[-1]
+        .rpartition("/")[2]
     )
     word_pair["word_id"] = word_id
 
@@ -126,6 +198,7 @@ def fetch_word_data(word_id, browser):
     pending_ids, mean_list, example_list = [word_id], [], []
     etymon_sign = "의 어근."
     is_meaning_fetched = False
+    meaning = None
 
     while pending_ids:
         # Process each word ID until id list is empty
@@ -133,67 +206,38 @@ def fetch_word_data(word_id, browser):
         detail_url = f"https://ko.dict.naver.com/#/entry/koko/{word_id}"
         browser.get_await(url=detail_url, locator=(By.CLASS_NAME, "mean_tray"))
 
-        try:
-            # Check if there are sub-items (derived words) and add up into list
-            entry_info = browser.find_element(
-                By.CSS_SELECTOR, ".component_entry .entry_infos dl.entry_default"
-            )
-            if entry_info.find_element(By.TAG_NAME, "dt").text == "파생어":
-                # Extract sub-items and add their IDs to the pending list
-                sub_items = entry_info.find_elements(By.CSS_SELECTOR, "dd a")
-                for item in sub_items:
-                    sub_id = item.get_attribute("href").split("/")[-1]
-                    if sub_id not in pending_ids:
-                        pending_ids.append(sub_id)
+        # Collect the whole entry in a single round-trip instead of one per element
+        entry = browser.execute_script(WORD_ENTRY_SCRIPT)
 
-        except NoSuchElementException:
-            pass
+        # Add the IDs of sub-items (derived words) up into the pending list
+        for href in entry["derived_hrefs"]:
+            sub_id = href.rpartition("/")[2]
+            if sub_id not in pending_ids:
+                pending_ids.append(sub_id)
 
         # Extract meanings and examples for the current word ID
-        mean_objs = browser.find_elements(
-            By.CSS_SELECTOR, ".mean_tray ul.mean_list li.mean_item"
-        )
-
-        for mean_obj in mean_objs:
+        for mean_item in entry["mean_items"]:
             if not is_meaning_fetched:
                 # Extract meanings for each iteration if not fetched yet
-                meaning_objs = mean_obj.find_elements(
-                    By.CSS_SELECTOR, ".mean_desc .cont"
-                )
-                for meaning_obj in meaning_objs:
-                    meaning = ""
-
-                    meaning = meaning_obj.find_element(
-                        By.CSS_SELECTOR, "span.mean"
-                    ).text
+                for meaning_info in mean_item["meanings"]:
+                    meaning = meaning_info["mean"]
 
                     # Retry fetching meaning if etymon_sign is founded
-                    if meaning.endswith(etymon_sign):
+                    if meaning is None or meaning.endswith(etymon_sign):
                         meaning = None
                         continue
 
-                    try:
-                        # Check if there is word theme for the meaning
-                        word_theme = meaning_obj.find_element(
-                            By.CSS_SELECTOR, "span.mean_addition"
-                        )
-                        meaning = f"[{word_theme.text}] {meaning}"
-                    except NoSuchElementException:
-                        pass
+                    # Check if there is word theme for the meaning
+                    if meaning_info["addition"] is not None:
+                        meaning = f"[{meaning_info['addition']}] {meaning}"
 
                     # Append the completed meaning string to the list
                     mean_list.append(meaning)
 
             # Extract examples for each meaning
-            examples = mean_obj.find_elements(
-                By.CSS_SELECTOR, ".example .example_item p.origin span.text"
-            )
-
-            for example_obj in examples:
-                # Extract and clean the example text using BeautifulSoup
-                example = BeautifulSoup(
-                    example_obj.get_attribute("innerHTML"), "html.parser"
-                ).get_text()
+            for example_html in mean_item["examples"]:
+                # Extract and clean the example text
+                example = html_to_text(example_html)
                 # Filter examples based on word length so that minor examples could be exlucded
                 example = filter_by_word_length(
                     example.strip(), min_length=3, max_length=9
@@ -211,8 +255,8 @@ def export_word_csv_data(word_data, filename=None):
     """
     Export word data to a CSV file.
 
-    :param word_data: A list of dictionaries containing word data.
-    :type word_data: list
+    :param word_data: Dictionaries containing word data.
+    :type word_data: list or iterable
     :return: The name of the created CSV file.
     :rtype: str
     """
@@ -228,28 +272,78 @@ def export_word_csv_data(word_data, filename=None):
         "naver_word_id",
     ]
 
-    # Align data with fieldnames
-    csv_data = []
-    for word_item in word_data:
-        csv_data.append(
-            {
-                "word_hanja": word_item["hanja"],
-                "word_korean": word_item["korean"],
-                "means": "<br>".join(word_item["means"]),
-                "examples": "<br>".join(word_item["examples"]),
-                "naver_word_id": word_item["word_id"],
-            }
+    # Align data with fieldnames, yielding rows lazily so they are streamed into the file
+    csv_data = (
+        (
+            word_item["hanja"],
+            word_item["korean"],
+            "<br>".join(word_item["means"]),
+            "<br>".join(word_item["examples"]),
+            word_item["word_id"],
         )
+        for word_item in word_data
+    )
 
     if filename:
-        export_to_csv(fieldnames, csv_data, csv_keyword, filename)
+        export_to_csv(fieldnames, csv_data, csv_keyword, filename, flatten=False)
     else:
-        filename = export_to_csv(fieldnames, csv_data, csv_keyword)
+        filename = export_to_csv(fieldnames, csv_data, csv_keyword, flatten=False)
     logger.info("CSV Export Finished")
 
     return filename
 
 
+def load_cached_words(cache_conn, criteria_hanja, word_list):
+    """
+    Load the cached data of the given words of a Hanja character.
+
+    :param cache_conn: A connection to the word cache database.
+    :type cache_conn: sqlite3.Connection
+    :param criteria_hanja: The Hanja character the words belong to.
+    :type criteria_hanja: str
+    :param word_list: The Korean words to look up.
+    :type word_list: list
+    :return: A dictionary of word data lists keyed by the Korean words found in the cache.
+    :rtype: dict
+    """
+    cache_conn.execute(
+        "CREATE TABLE IF NOT EXISTS word_cache (hanja TEXT, word TEXT, data TEXT, PRIMARY KEY (hanja, word))"
+    )
+
+    cached = {}
+    # Stay below SQLite's limit on the number of query parameters
+    for start in range(0, len(word_list), 500):
+        batch = word_list[start : start + 500]
+        placeholders = ", ".join("?" for _ in batch)
+        for word, data in cache_conn.execute(
+            f"SELECT word, data FROM word_cache WHERE hanja = ? AND word IN ({placeholders})",
+            [criteria_hanja, *batch],
+        ):
+            cached[word] = json.loads(data)
+
+    return cached
+
+
+def store_cached_words(cache_conn, criteria_hanja, word_items_by_word):
+    """
+    Store successfully fetched word data in the cache, replacing older entries.
+
+    :param cache_conn: A connection to the word cache database.
+    :type cache_conn: sqlite3.Connection
+    :param criteria_hanja: The Hanja character the words belong to.
+    :type criteria_hanja: str
+    :param word_items_by_word: Lists of word data dictionaries keyed by Korean word.
+    :type word_items_by_word: dict
+    """
+    cache_conn.executemany(
+        "INSERT OR REPLACE INTO word_cache (hanja, word, data) VALUES (?, ?, ?)",
+        (
+            (criteria_hanja, word, json.dumps(word_items, ensure_ascii=False))
+            for word, word_items in word_items_by_word.items()
+        ),
+    )
+
+
 def scrape_word(
     criteria_hanja,
     word_list,
@@ -261,6 +355,7 @@ def scrape_word(
     Scrape word data for a list of Korean words associated with a Hanja character.
 
     The function fetches word data from Naver dictionary for a specified Hanja character and a list of Korean words.
+    Successfully fetched words are kept in an on-disk cache so later runs skip words that were already scraped.
 
     :param criteria_hanja: The Hanja character to search for.
     :type criteria_hanja: str or None
@@ -284,36 +379,61 @@ def scrape_word(
             f"word_list should contain valid single words without whitespace or newline characters. Found: {criteria_hanja}: {word_list}"
         )
 
-    # Create an instance of SeleniumDriver for web scraping if not provided
-    with selenium_driver or SeleniumDriver() as browser:
-        logger.info(f"Scrapping {criteria_hanja}'s words:")
-        word_data = []
-
-        # Iterate through the list of Korean words and fetch their data
-        for idx, word in enumerate(word_list, 1):
-            word_pairs = match_word_to_hanja(criteria_hanja, word, browser)
-
-            if word_pairs is None:
-                logger.error(f"[{idx} / {len(word_list)}] Fetch Failed: {word}")
-                continue  # Skip to the next word on failure
-
-            # Fetch word IDs and additional data for each word
-            for word_pair in word_pairs:
-                word_item = fetch_word_id(word_pair, browser)
-
-                if word_item is None:
-                    continue  # Skip to the next word on failure
-
-                word_item = {
-                    **word_item,
-                    **fetch_word_data(word_item["word_id"], browser),
-                    "reference_idx": reference_idx,
-                }
-                word_data.append(word_item)
-
-                logger.info(
-                    f"[{idx} / {len(word_list)}] {word}({word_item['hanja']})'s data has been fetched."
-                )
+    os.makedirs(os.path.dirname(WORD_CACHE_PATH), exist_ok=True)
+    cache_conn = sqlite3.connect(WORD_CACHE_PATH)
+    try:
+        # Commit the newly scraped data when the block ends without errors
+        with cache_conn:
+            # Only scrape the words missing from the cache
+            cached = load_cached_words(cache_conn, criteria_hanja, word_list)
+            pending_words = [word for word in dict.fromkeys(word_list) if word not in cached]
+            if cached:
+                logger.info(f"{len(cached)} words of {criteria_hanja} loaded from cache.")
+
+            scraped = {}
+            if pending_words:
+                # Create an instance of SeleniumDriver for web scraping if not provided
+                with selenium_driver or SeleniumDriver() as browser:
+                    logger.info(f"Scrapping {criteria_hanja}'s words:")
+
+                    # Iterate through the list of Korean words and fetch their data
+                    for idx, word in enumerate(pending_words, 1):
+                        word_pairs = match_word_to_hanja(criteria_hanja, word, browser)
+
+                        if word_pairs is None:
+                            logger.error(f"[{idx} / {len(pending_words)}] Fetch Failed: {word}")
+                            continue  # Skip to the next word on failure
+
+                        # Fetch word IDs and additional data for each word
+                        word_items = []
+                        for word_pair in word_pairs:
+                            word_item = fetch_word_id(word_pair, browser)
+
+                            if word_item is None:
+                                continue  # Skip to the next word on failure
+
+                            word_item = {
+                                **word_item,
+                                **fetch_word_data(word_item["word_id"], browser),
+                            }
+                            word_items.append(word_item)
+
+                            logger.info(
+                                f"[{idx} / {len(pending_words)}] {word}({word_item['hanja']})'s data has been fetched."
+                            )
+                        if word_items:
+                            scraped[word] = word_items
+
+                store_cached_words(cache_conn, criteria_hanja, scraped)
+    finally:
+        cache_conn.close()
+
+    # Expand the results back to the word list, in input order
+    word_data = [
+        {**word_item, "reference_idx": reference_idx}
+        for word in word_list
+        for word_item in cached.get(word) or scraped.get(word, ())
+    ]
 
     logger.info("WebCrawling Finished.")
 
@@ -323,33 +443,44 @@ def scrape_word(
     return word_data
 
 
-def scrape_multiple_words(word_objs, instant_csv=False):
+def scrape_multiple_words(word_objs, instant_csv=False, max_workers=4):
     """
     Scrape word data for a list of word pairs and export to CSV.
 
+    The words of each Hanja are scraped in parallel, each task borrowing a browser from the shared driver pool.
+
     :param word_objs: A list of tuples containing word pairs (criteria_hanja, word_list).
     :type word_objs: list
+    :param max_workers: The maximum number of browser sessions scraping in parallel, capped at MAX_BROWSER_WORKERS.
+                        Use 1 to scrape sequentially.
+    :type max_workers: int, optional
     """
+    pending_objs = [word_obj for word_obj in word_objs if word_obj["words"][0] != "_"]
+
+    # Borrow a warm browser from the shared pool instead of launching a new one
+    def scrape_with_pooled_browser(word_obj):
+        with driver_pool.borrow() as browser:
+            return scrape_word(
+                word_obj["hanja"],
+                word_obj["words"],
+                word_obj["reference_idx"],
+                selenium_driver=browser,
+            )
 
-    # Create an instance of SeleniumDriver for web scraping
-    with SeleniumDriver() as browser:
-        word_data_list = []
-        csv_filename = None
-
-        for word_obj in word_objs:
-            if word_obj["words"][0] != "_":
-                word_data = scrape_word(
-                    word_obj["hanja"],
-                    word_obj["words"],
-                    word_obj["reference_idx"],
-                    selenium_driver=browser,
-                )
-                word_data_list.extend(word_data)
-                if instant_csv:
-                    if not csv_filename:
-                        csv_filename = export_word_csv_data(word_data)
-                    else:
-                        export_word_csv_data(word_data, csv_filename)
+    word_data_list = []
+    csv_filename = None
+
+    # Bound the number of browsers to avoid being rate-limited by Naver
+    num_workers = max(1, min(max_workers, MAX_BROWSER_WORKERS, len(pending_objs)))
+    with ThreadPoolExecutor(max_workers=num_workers) as executor:
+        # map yields the results in input order, so the CSV rows keep the input order
+        for word_data in executor.map(scrape_with_pooled_browser, pending_objs):
+            word_data_list.extend(word_data)
+            if instant_csv:
+                if not csv_filename:
+                    csv_filename = export_word_csv_data(word_data)
+                else:
+                    export_word_csv_data(word_data, csv_filename)
     return word_data_list
 
 
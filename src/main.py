@@ -1,3 +1,6 @@
+import re
+from functools import partial
+
 from components.input import process_hanja_txt
 from utils.csv import export_to_csv
 from utils.hanja_tool import (
@@ -6,19 +9,39 @@ from utils.hanja_tool import (
     add_numbering_to_list,
     create_unordered_list,
 )
-from functools import partial
+
+
+# Line patterns of an input entry, compiled once at import
+INPUT_PATTERNS = [
+    re.compile(r"(?P<hanja>[\w]):?(?P<simplified_char>[\w])?"),
+    re.compile(r"(?P<meaning>[\w\s.;]+)"),
+    re.compile(r"(?P<rank>[\d.]+)/(?P<reference_idx>[\d]+)"),
+    (re.compile(r"(?P<words>.*)"), "."),
+]
+
+# Keys of the exported entries, in column order
+HANJA_FIELDNAMES = (
+    "hanja",
+    "simplified_char",
+    "meaning",
+    "meaning_official",
+    "radical",
+    "stroke_count",
+    "formation_letter",
+    "rank",
+    "unicode",
+    "tags",
+)
+WORD_FIELDNAMES = ("hanja", "korean", "means", "examples", "tags")
 
 
 result = process_hanja_txt(
     file_path="2401270216.txt",
-    patterns=[
-        "(?P<hanja>[\w]):?(?P<simplified_char>[\w])?",
-        "(?P<meaning>[\w\s.;]+)",
-        "(?P<rank>[\d.]+)/(?P<reference_idx>[\d]+)",
-        ("(?P<words>.*)", "."),
-    ],
-    hanja_entry="hanja|simplified_char|meaning|meaning_official|radical|stroke_count|formation_letter|rank|unicode|tags",
-    word_entry="hanja|korean|means|examples|tags",
+    patterns=INPUT_PATTERNS,
+    # Every entry has a "rank/reference_idx" line
+    required_literal="/",
+    hanja_entry=HANJA_FIELDNAMES,
+    word_entry=WORD_FIELDNAMES,
     hanja_modifiers=[
         (format_num_to_hanja_rank, "rank"),
     ],
@@ -32,5 +55,5 @@ result = process_hanja_txt(
 hanja_list = result[0]
 word_list = result[1]
 
-export_to_csv(list(hanja_list[0].keys()), hanja_list, "hanja", is_header=False)
-export_to_csv(list(word_list[0].keys()), word_list, "word", is_header=False)
+export_to_csv(HANJA_FIELDNAMES, hanja_list, "hanja", is_header=False)
+export_to_csv(WORD_FIELDNAMES, word_list, "word", is_header=False)
@@ -1,4 +1,6 @@
 import ast
+import json
+from functools import lru_cache
 from utils.logger import logger
 
 
@@ -15,20 +17,21 @@ from utils.logger import logger
 
 
 def create_anki_tags(data, tag_template, values):
+    # Resolve once which values are entry keys (enclosed in curly brackets) and which are literal strings
+    value_keys = [
+        (value, value.strip("{}") if "{" in value and "}" in value else None)
+        for value in values
+    ]
+
     for entry in data:
-        tag_values = []
-        for value in values:
-            if "{" in value and "}" in value:
-                # If the value is enclosed in curly brackets, find the key in the entry
-                key = value.strip("{}")
-                if key not in entry:
-                    raise KeyError(
-                        f"Key '{key}' not found in entry: {entry}. Check the 'values' argument for valid keys: {values}"
-                    )
-                tag_values.append(entry[key])
-            else:
-                # If the value is just a string, use it as the key
-                tag_values.append(value)
+        try:
+            tag_values = [
+                value if key is None else entry[key] for value, key in value_keys
+            ]
+        except KeyError as e:
+            raise KeyError(
+                f"Key '{e.args[0]}' not found in entry: {entry}. Check the 'values' argument for valid keys: {values}"
+            ) from None
 
         h_str = tag_template.format(*tag_values)
         h_list = create_hierarchy_instance(h_str)
@@ -36,6 +39,27 @@ def create_anki_tags(data, tag_template, values):
     return data
 
 
+@lru_cache(maxsize=4096)
+def parse_literal(string):
+    """
+    Evaluate a literal string, memoized as the same tag strings repeat across entries.
+
+    Tag templates are written as JSON, which json.loads parses in C. Other Python literals
+    (e.g. single-quoted strings) fall back to ast.literal_eval.
+    The parsed value is shared between calls, so it must not be modified.
+
+    Args:
+        string (str): The literal to evaluate.
+
+    Returns:
+        Any: The evaluated value.
+    """
+    try:
+        return json.loads(string)
+    except json.JSONDecodeError:
+        return ast.literal_eval(string)
+
+
 def create_hierarchy_instance(input_string, delimiter="::"):
     """
     Converts a hierarchical input string into Anki tags.
@@ -51,46 +75,47 @@ def create_hierarchy_instance(input_string, delimiter="::"):
     def convert_string_to_dict(string):
         """Converts a string to a dictionary."""
         try:
-            return ast.literal_eval(string)
+            return parse_literal(string)
         except (SyntaxError, ValueError) as e:
             logger.warning(
                 f"Error evaluating string: {e}\nProblematic string: {input_string}"
             )
             return {}
 
-    def generate_hierarchy(node, current_path="", result=None):
-        """Recursively generates a hierarchy list from a nested dictionary or list."""
-        if result is None:
-            result = []
-
-        # If the current node is a dictionary, iterate through key-value pairs
-        if isinstance(node, dict):
-            for key, value in node.items():
-                new_path = current_path + str(key)
-                result.append(new_path)
-                # Recursively call generate_hierarchy for the nested value
-                generate_hierarchy(value, new_path + delimiter, result)
-        # If the current node is a list, iterate through items
-        elif isinstance(node, list):
-            # Add delimiter only once before processing the list items
-            for item in node:
-                new_path = current_path
-                # If the item is a nested dictionary or list, recursively call generate_hierarchy
-                if isinstance(item, (dict, list)):
-                    generate_hierarchy(item, new_path, result)
-                # If the item is a string or other type, add it to the result
-                else:
-                    result.append(
-                        new_path + (str(item) if isinstance(item, str) else str(item))
-                    )
-        # If the current node is a string, add it to the result
-        elif isinstance(node, str):
-            result.append(current_path + node)
+    def generate_hierarchy(root):
+        """Generates a hierarchy list from a nested dictionary or list, walking it with an explicit stack."""
+        result = []
+        # Each item is (node, path of the node, tag to add before visiting the node)
+        stack = [(root, "", None)]
+
+        while stack:
+            node, current_path, tag = stack.pop()
+            if tag is not None:
+                result.append(tag)
+
+            # Children are pushed in reverse so they are visited in their original order
+            # If the current node is a dictionary, each key adds a tag and nests its value under it
+            if isinstance(node, dict):
+                for key, value in reversed(node.items()):
+                    new_path = current_path + str(key)
+                    stack.append((value, new_path + delimiter, new_path))
+            # If the current node is a list, its items share the current path
+            elif isinstance(node, list):
+                for item in reversed(node):
+                    if isinstance(item, (dict, list)):
+                        stack.append((item, current_path, None))
+                    # If the item is a string or other type, it only adds its own tag
+                    else:
+                        stack.append((None, current_path, current_path + str(item)))
+            # If the current node is a string, add it to the result
+            elif isinstance(node, str):
+                result.append(current_path + node)
+
+        return result
 
     # Generate hierarchy from input string through dictionary
-    hierarchy_list = []
     input_dict = convert_string_to_dict(input_string)
-    generate_hierarchy(input_dict, "", hierarchy_list)
+    hierarchy_list = generate_hierarchy(input_dict)
 
     # return the Anki tags a string
     return hierarchy_list
@@ -1,73 +1,167 @@
 import csv
+import itertools
+from operator import itemgetter
+from contextlib import contextmanager
 from datetime import datetime
 
+# Rows are buffered in memory and flushed to disk in 4 MiB blocks
+CSV_WRITE_BUFFER_SIZE = 4 * 1024 * 1024
 
-def export_to_csv(fieldnames, data, keyword, filename=None, is_header=True):
+
+def resolve_output_name(keyword, filename=None):
     """
-    Export data to a CSV file.
+    Resolve the name of the CSV file to write under data/output.
 
-    :param fieldnames: A list of field names for the CSV header.
-    :type fieldnames: list
-    :param data: A list of dictionaries containing data to be exported to the CSV file.
-    :type data: list
     :param keyword: A string representing the keyword for the CSV file name.
     :type keyword: str
-    :param filename: The name of the CSV file to export. If None, a timestamped name with the keyword will be generated.
-                     If provided, it should have the .csv extension.
+    :param filename: The name of the CSV file. If None, a timestamped name with the keyword will be generated.
     :type filename: str or None
-    :return: The name of the created CSV file.
+    :return: The CSV file name.
     :rtype: str
     """
-    # Input validation for fieldnames and data
-    if not isinstance(fieldnames, list) or not all(
-        isinstance(field, str) for field in fieldnames
-    ):
-        raise ValueError("fieldnames should be a list of strings")
-
-    if not isinstance(data, list) or not all(isinstance(row, dict) for row in data):
-        raise ValueError("data should be a list of dictionaries")
-
-    # Ensure keys in data dictionaries match the fieldnames
-    if not all(set(fieldnames) == set(row.keys()) for row in data):
-        raise ValueError("Keys in data dictionaries must match the fieldnames")
-
     # Generate timestamp for unique file name if filename is None
     if filename is None:
         timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-        output_name = f"{keyword}_csv_{timestamp}.csv"
-    else:
-        # If filename is provided, use it and adjust file_mode to "a"
-        if "/" in filename:
-            raise ValueError("File name should not contain a path.")
+        return f"{keyword}_csv_{timestamp}.csv"
 
-        # Ensure the file has a .csv extension
-        if not filename.endswith(".csv"):
-            filename += ".csv"
+    # If filename is provided, use it and adjust file_mode to "a"
+    if "/" in filename:
+        raise ValueError("File name should not contain a path.")
 
-        if filename.split(".")[-1] != "csv":
-            raise ValueError("The provided file name must have the .csv extension.")
+    # Ensure the file has a .csv extension
+    if not filename.endswith(".csv"):
+        filename += ".csv"
 
-        output_name = filename
+    if filename.rpartition(".")[2] != "csv":
+        raise ValueError("The provided file name must have the .csv extension.")
+
+    return filename
+
+
+@contextmanager
+def open_csv_writer(fieldnames, keyword, filename=None, is_header=True):
+    """
+    Open a CSV file for writing rows one at a time as they become available.
+
+    Rows are written with a plain csv.writer, so they should be tuples of already
+    flattened values ordered like fieldnames.
+
+    :param fieldnames: A list or tuple of field names for the CSV header.
+    :type fieldnames: list or tuple
+    :param keyword: A string representing the keyword for the CSV file name.
+    :type keyword: str
+    :param filename: The name of the CSV file to append to. If None, a timestamped name with the keyword will be generated.
+    :type filename: str or None
+    :return: A context manager yielding the csv writer, the open file (e.g. to flush it) and the name of the CSV file.
+    :rtype: contextmanager
+    """
+    output_name = resolve_output_name(keyword, filename)
 
-    # Write data to CSV file
     file_mode = "w" if filename is None else "a"
     with open(
-        f"data/output/{output_name}", file_mode, newline="", encoding="utf-8"
+        f"data/output/{output_name}",
+        file_mode,
+        buffering=CSV_WRITE_BUFFER_SIZE,
+        newline="",
+        encoding="utf-8",
     ) as csvfile:
-        csvwriter = csv.DictWriter(csvfile, fieldnames=fieldnames)
+        csvwriter = csv.writer(csvfile)
 
         # Write header only if the file is newly created
         if file_mode == "w" and is_header:
-            csvwriter.writeheader()
+            csvwriter.writerow(fieldnames)
+
+        yield csvwriter, csvfile, output_name
+
 
+def export_to_csv(
+    fieldnames, data, keyword, filename=None, is_header=True, flatten=True
+):
+    """
+    Export data to a CSV file.
+
+    :param fieldnames: A list or tuple of field names for the CSV header.
+    :type fieldnames: list or tuple
+    :param data: A list of dictionaries containing data to be exported to the CSV file,
+                 or a list of tuples whose values are ordered like fieldnames.
+                 Any other iterable (e.g. a generator) is streamed to the file row by row.
+    :type data: list or iterable
+    :param keyword: A string representing the keyword for the CSV file name.
+    :type keyword: str
+    :param filename: The name of the CSV file to export. If None, a timestamped name with the keyword will be generated.
+                     If provided, it should have the .csv extension.
+    :type filename: str or None
+    :param flatten: If False, rows are written as they are, skipping the list and tuple flattening
+                    for data whose values are already strings.
+    :type flatten: bool
+    :return: The name of the created CSV file.
+    :rtype: str
+    """
+    # Input validation for fieldnames and data
+    if not isinstance(fieldnames, (list, tuple)) or not all(
+        isinstance(field, str) for field in fieldnames
+    ):
+        raise ValueError("fieldnames should be a list or tuple of strings")
+
+    # Peek at the first row to tell tuple rows from dictionary rows
+    rows = iter(data)
+    first_row = next(rows, None)
+    is_tuple_rows = isinstance(first_row, tuple)
+    row_type = tuple if is_tuple_rows else dict
+    # dict.keys() compares against a set without building one per row
+    fieldname_set = frozenset(fieldnames)
+
+    def validate_row(row):
+        if not isinstance(row, row_type):
+            raise ValueError("data should contain dictionaries or tuples")
+
+        if is_tuple_rows:
+            # Ensure tuple rows have one value per fieldname
+            if len(row) != len(fieldnames):
+                raise ValueError("Tuples in data must have one value per fieldname")
+        # Ensure keys in data dictionaries match the fieldnames
+        elif row.keys() != fieldname_set:
+            raise ValueError("Keys in data dictionaries must match the fieldnames")
+        return row
+
+    if isinstance(data, list):
+        # Validate a list up front so no file is written for invalid data
         for row in data:
-            # Convert list values to a string with "<br>" delimiter
-            for key, value in row.items():
-                if isinstance(value, list):
-                    row[key] = "<br>".join(map(str, value))
-                elif isinstance(value, tuple):
-                    row[key] = "+".join(map(str, value))
-
-            csvwriter.writerow(row)
+            validate_row(row)
+        rows = data
+    elif first_row is None:
+        rows = []
+    else:
+        # Validate other iterables lazily so rows are streamed without being held in memory
+        rows = map(validate_row, itertools.chain([first_row], rows))
+
+    def flatten_value(value):
+        # Convert list values to a string with "<br>" delimiter
+        if isinstance(value, list):
+            return "<br>".join(map(str, value))
+        elif isinstance(value, tuple):
+            return "+".join(map(str, value))
+        return value
+
+    def flatten_row(row):
+        return tuple(map(flatten_value, row))
+
+    if not is_tuple_rows:
+        # Dictionary rows hold exactly the fieldnames, so their values are read in fieldname order
+        # and written by csv.writer, skipping DictWriter's per-row key check
+        if len(fieldnames) > 1:
+            get_values = itemgetter(*fieldnames)
+        else:
+            get_values = lambda row: tuple(row[field] for field in fieldnames)
+        rows = map(get_values, rows)
+
+    # Write data to CSV file, opened the same way as the files written row by row
+    with open_csv_writer(fieldnames, keyword, filename, is_header) as (
+        csvwriter,
+        _,
+        output_name,
+    ):
+        # Write all rows in a single call with a large buffer to reduce write syscalls
+        csvwriter.writerows(map(flatten_row, rows) if flatten else rows)
 
     return output_name
@@ -1,7 +1,9 @@
 import re
-import urllib.parse
+from bisect import bisect_right
+from functools import lru_cache
 
-hanja_ranges = [
+# Module-level constant, built once at import rather than per is_hanja call
+hanja_ranges = (
     (0x2E80, 0x2EFF),  # Korean, Chinese, and Japanese supplemental characters
     (0x4E00, 0x9FBF),  # Common Chinese characters
     (0xF900, 0xFAFF),  # Compatibility Ideographs
@@ -11,7 +13,44 @@ hanja_ranges = [
     (0x2B740, 0x2B81F),  # Extension D (rarely used)
     (0x2B820, 0x2CEAF),  # Extension E (rarely used)
     (0x2F800, 0x2FA1F),  # Compatibility Supplement
-]
+)
+
+# Split ranges by plane so astral ranges are only scanned for astral characters
+_BMP_RANGES = tuple((start, end) for start, end in hanja_ranges if end <= 0xFFFF)
+_ASTRAL_RANGES = tuple((start, end) for start, end in hanja_ranges if start > 0xFFFF)
+
+# Sorted astral range bounds (start, end + 1, ...) for a binary search
+_ASTRAL_BOUNDS = tuple(
+    bound for start, end in sorted(_ASTRAL_RANGES) for bound in (start, end + 1)
+)
+
+# Precomputed lookup table for BMP code points (1 if the code point is Hanja)
+_BMP_HANJA = bytearray(0x10000)
+for _start, _end in _BMP_RANGES:
+    _BMP_HANJA[_start : _end + 1] = b"\x01" * (_end - _start + 1)
+
+
+# Character class matching a single Hanja character of any range above
+_HANJA_PATTERN = re.compile(
+    "[" + "".join(f"{chr(start)}-{chr(end)}" for start, end in hanja_ranges) + "]"
+)
+_HANJA_TEXT_PATTERN = re.compile(_HANJA_PATTERN.pattern + "+")
+# Negated class matching runs of non-Hanja characters, dropped in one pass by filter_hanja
+_NON_HANJA_PATTERN = re.compile("[^" + _HANJA_PATTERN.pattern[1:] + "+")
+
+# Korean word followed by its homonym index, e.g. "사기 2"
+_WORD_INDEX_PATTERN = re.compile(r"(\w+) (\d+)")
+
+# Percent-encoded form of every byte value, used to URL-encode Hanja without urllib
+_PERCENT_ENCODED = tuple(f"%{byte:02X}" for byte in range(256))
+
+# Hanja rank of every valid rank value, keyed by number and by its canonical string
+_HANJA_RANKS = {0: "特級", 0.5: "特級II", 9: "級外字"}
+for _level in range(1, 9):
+    _HANJA_RANKS[_level] = f"{_level}級"
+for _level in range(1, 8):
+    _HANJA_RANKS[_level + 0.5] = f"{_level}級II"
+_HANJA_RANKS.update({str(value): rank for value, rank in list(_HANJA_RANKS.items())})
 
 
 class InvalidHanjaCharacterError(Exception):
@@ -23,10 +62,51 @@ class InvalidHanjaCharacterError(Exception):
 def is_hanja(char):
     """Check if a charater is a valid Hanja character."""
     code_point = ord(char)
-    for start, end in hanja_ranges:
-        if start <= code_point <= end:
-            return True
-    return False
+
+    # Most characters are in the BMP, which is answered by a single table lookup
+    if code_point <= 0xFFFF:
+        return _BMP_HANJA[code_point] == 1
+
+    # Astral code points fall inside a range when an odd number of bounds are at or below them
+    return bisect_right(_ASTRAL_BOUNDS, code_point) & 1 == 1
+
+
+def filter_hanja(text):
+    """
+    Keep only the Hanja characters of a string.
+
+    Runs of non-Hanja characters are deleted by a single compiled regex instead of calling
+    is_hanja per character.
+
+    :param text: The string to filter.
+    :type text: str
+    :returns: The Hanja characters of text, in order.
+    :rtype: str
+    """
+    return _NON_HANJA_PATTERN.sub("", text)
+
+
+@lru_cache(maxsize=1)
+def _load_hanja_mapping(mapping_file="src/utils/hanja_mapping.txt"):
+    """
+    Load the Hanja mapping file once into a variant-to-standard dictionary.
+
+    :param mapping_file: Path to the mapping file.
+    :type mapping_file: str
+    :returns: A dictionary mapping each variant character to its standard character.
+    :rtype: dict
+    """
+    mapping = {}
+
+    with open(mapping_file, "r", encoding="utf-8") as f:
+        lines = f.read().splitlines()
+
+    # Walk the lines backwards so the first mapping found in the file wins
+    for line in reversed(lines):
+        standard_char, *variants = line.strip().split(":")
+        mapping.update(dict.fromkeys(variants, standard_char))
+
+    return mapping
 
 
 def standardize_hanja(hanja):
@@ -38,39 +118,39 @@ def standardize_hanja(hanja):
     :returns: The standardized Hanja character.
     :rtype: str
     """
-    mapping_file = "src/utils/hanja_mapping.txt"
-
-    with open(mapping_file, "r", encoding="utf-8") as f:
-        for line in f:
-            standard_char, *variants = line.strip().split(":")
-            if hanja in variants:
-                return standard_char
     # If no mapping is found, return the original character
-    return hanja
+    return _load_hanja_mapping().get(hanja, hanja)
 
 
+@lru_cache(maxsize=4096)
 def hanja_to_url(hanja_text, length=0):
     """
     Encode a Hanja text into a URL-friendly format.
 
+    Results are memoized, so repeated calls with the same text skip validation and encoding.
+    Invalid inputs are not cached and raise again on every call.
+
     :param str hanja_text: The Hanja text to encode.
     :param int length: Expected length of the Hanja text (optional).
     :raises InvalidHanjaCharacterError: If the input contains invalid Hanja characters or an invalid length.
     :returns: The URL-encoded Hanja text.
     :rtype: str
     """
-    if length > 0 and len(hanja_text) == length:
+    if length > 0 and len(hanja_text) != length:
         raise InvalidHanjaCharacterError(
             f"Invalid input length. Expected {length} characters."
         )
 
-    for char in hanja_text:
-        if not is_hanja(char):
-            raise InvalidHanjaCharacterError(
-                f"'{hanja_text}' is not a valid Hanja character. Please provide a valid Hanja character."
-            )
+    # Validate every character in a single regex scan
+    if not _HANJA_TEXT_PATTERN.fullmatch(hanja_text):
+        raise InvalidHanjaCharacterError(
+            f"'{hanja_text}' is not a valid Hanja character. Please provide a valid Hanja character."
+        )
 
-    url_encoded = urllib.parse.quote(hanja_text, encoding="utf-8")
+    # Hanja are never URL-safe characters, so every UTF-8 byte is percent-encoded
+    url_encoded = "".join(
+        _PERCENT_ENCODED[byte] for byte in hanja_text.encode("utf-8")
+    )
     return url_encoded
 
 
@@ -88,28 +168,22 @@ def format_num_to_hanja_rank(value):
         ValueError: If the value is not a valid Hanja rank.
     """
 
-    # Ensure value is float
-    value = float(value)
-
-    # Check if value matches a predefined rank
-    rank_mapping = [(0, "特級"), (0.5, "特級II"), (9, "級外字")]
-    for v, result in rank_mapping:
-        if value == v:
-            return result
-
-    # Format value into Hanja Rank
-    if 1 <= value <= 8:
-        if value % 1 == 0:
-            return f"{int(value)}級"
-        elif value % 1 == 0.5:
-            return f"{int(value)}級II"
+    # Canonical values such as "3.5" or 7 are answered by a single lookup
+    try:
+        return _HANJA_RANKS[value]
+    except (KeyError, TypeError):
+        pass
 
-    raise ValueError("Invalid value for Hanja Rank")
+    # Other spellings such as "7.0" are normalized through float
+    try:
+        return _HANJA_RANKS[float(value)]
+    except KeyError:
+        raise ValueError("Invalid value for Hanja Rank") from None
 
 
 def add_sup_word_index(word):
     """Add <sup> tag for word index."""
-    match = re.match(r"(\w+) (\d+)", word)
+    match = _WORD_INDEX_PATTERN.match(word)
     if match:
         return f"{match.group(1)}<sup>{match.group(2)}</sup>"
     else:
@@ -118,11 +192,11 @@ def add_sup_word_index(word):
 
 def add_numbering_to_list(input_list):
     """Add numbering to each item in a list."""
-    numbered_list = ["{}. {}".format(i + 1, item) for i, item in enumerate(input_list)]
+    numbered_list = [f"{i}. {item}" for i, item in enumerate(input_list, 1)]
     return numbered_list
 
 
 def create_unordered_list(input_list):
     """Create an unordered list from a given list of items."""
-    unordered_list = ["- {}".format(item) for item in input_list]
+    unordered_list = [f"- {item}" for item in input_list]
     return unordered_list
@@ -40,6 +40,8 @@ class LevelBasedFileHandler(logging.Handler):
         self.encoding = encoding
         self.setFormatter(logging.Formatter(LOG_FORMAT))
         self.log_file_path = None
+        # The log file is opened on the first captured record and kept open afterwards
+        self._file = None
         # Create the "logs" directory if it doesn't exist
         if not os.path.exists(directory):
             os.makedirs(directory)
@@ -54,12 +56,26 @@ class LevelBasedFileHandler(logging.Handler):
                     self.directory, f"{timestamp}_error.log"
                 )
 
-            with open(
-                self.log_file_path,
-                self.mode,
-                encoding=self.encoding,
-            ) as file:
-                file.write(self.format(record) + "\n")
+            if self._file is None:
+                # Line buffering writes each record out as soon as it is logged
+                self._file = open(
+                    self.log_file_path,
+                    self.mode,
+                    encoding=self.encoding,
+                    buffering=1,
+                )
+            self._file.write(self.format(record) + "\n")
+
+    def close(self):
+        """Close the log file. Called by logging.shutdown() when the interpreter exits."""
+        self.acquire()
+        try:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        finally:
+            self.release()
+        super().close()
 
 
 # Add the custom LevelBasedFileHandler to capture log messages of WARNING level and higher
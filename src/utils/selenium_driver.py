@@ -1,10 +1,48 @@
+import atexit
+import queue
+import threading
+from contextlib import contextmanager
 from utils.logger import logger
 from selenium import webdriver
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.service import Service as ChromeService
 from webdriver_manager.chrome import ChromeDriverManager
-from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from selenium.common.exceptions import (
+    NoSuchElementException,
+    StaleElementReferenceException,
+    TimeoutException,
+)
+
+
+# Upper bound on browser sessions scraping in parallel
+MAX_BROWSER_WORKERS = 8
+
+# Interval in seconds between element checks while waiting (Selenium defaults to 0.5)
+POLL_FREQUENCY = 0.05
+
+
+# Path of the installed ChromeDriver, resolved once per process
+_driver_path = None
+_driver_path_lock = threading.Lock()
+
+
+def get_chrome_driver_path():
+    """
+    Resolve the ChromeDriver path with ChromeDriverManager once and reuse it afterwards.
+
+    ChromeDriverManager().install() checks the latest driver version over the network,
+    so it is only called for the first SeleniumDriver of the process.
+
+    :return: The path to the ChromeDriver executable.
+    :rtype: str
+    """
+    global _driver_path
+
+    with _driver_path_lock:
+        if _driver_path is None:
+            _driver_path = ChromeDriverManager().install()
+        return _driver_path
 
 
 class SeleniumDriver(webdriver.Chrome):
@@ -13,9 +51,15 @@ class SeleniumDriver(webdriver.Chrome):
 
     :param options: A list of additional command-line arguments for Chrome options.
     :type options: list
+    :param page_load_strategy: When get() returns: "none" (immediately), "eager" (DOMContentLoaded)
+                               or "normal" (load event). With "eager" or "normal", get_await finds
+                               the element on its first check on server-rendered pages instead of polling.
+    :type page_load_strategy: str
+    :param block_images: If True, images are not downloaded, which cuts the bytes loaded per page.
+    :type block_images: bool
 
     Methods:
-    get_await(url, locator):
+    get_await(url, locator, timeout=5):
         Navigates to the specified URL and waits for an element to be present based on the provided locator.
 
         :param url: The URL to navigate to.
@@ -23,13 +67,21 @@ class SeleniumDriver(webdriver.Chrome):
         :param locator: A tuple with two elements (By, value) specifying the element locator.
                         Example: (By.ID, 'element_id')
         :type locator: tuple
+
+    get_hash_await(url, locator, timeout=5):
+        Navigates to a hash route of a single-page app, reusing the already loaded page when possible.
     """
 
     _with_depth = 0  # Counter to track the depth of nested 'with' statements
 
-    def __init__(self, options=None):
+    def __init__(self, options=None, page_load_strategy="none", block_images=True):
+        if page_load_strategy not in ("none", "eager", "normal"):
+            raise ValueError(
+                "page_load_strategy should be one of 'none', 'eager' or 'normal'"
+            )
+
         chrome_options = webdriver.ChromeOptions()
-        chrome_options.set_capability("pageLoadStrategy", "none")
+        chrome_options.set_capability("pageLoadStrategy", page_load_strategy)
 
         # If options is None or an empty list, use the default options
         if options is None:
@@ -48,9 +100,16 @@ class SeleniumDriver(webdriver.Chrome):
         for opt in options:
             chrome_options.add_argument(opt)
 
+        # Skip downloading images, which the scrapers never read
+        if block_images:
+            chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+            chrome_options.add_experimental_option(
+                "prefs", {"profile.managed_default_content_settings.images": 2}
+            )
+
         # Initialize the WebDriver with configured options
         super().__init__(
-            service=ChromeService(ChromeDriverManager().install()),
+            service=ChromeService(get_chrome_driver_path()),
             options=chrome_options,
         )
 
@@ -70,7 +129,7 @@ class SeleniumDriver(webdriver.Chrome):
         if not self._with_depth:
             self.quit()
 
-    def get_await(self, url, locator):
+    def get_await(self, url, locator, timeout=5):
         """
         Navigate to the specified URL and wait for an element to be present based on the provided locator.
 
@@ -79,6 +138,8 @@ class SeleniumDriver(webdriver.Chrome):
         :param locator: A tuple with two elements (By, value) specifying the element locator.
                         Example: (By.ID, 'element_id')
         :type locator: tuple
+        :param timeout: Maximum number of seconds to wait for the element.
+        :type timeout: float
         """
         if not isinstance(locator, tuple) or len(locator) != 2:
             raise ValueError("Locator should be a tuple with 2 arguments (By, value)")
@@ -88,7 +149,7 @@ class SeleniumDriver(webdriver.Chrome):
 
         try:
             # Wait for the element to be present
-            WebDriverWait(self, 5).until(
+            WebDriverWait(self, timeout, poll_frequency=POLL_FREQUENCY).until(
                 EC.presence_of_element_located((locator[0], locator[1]))
             )
         except NoSuchElementException:
@@ -97,3 +158,136 @@ class SeleniumDriver(webdriver.Chrome):
             logger.warning(
                 f"{locator[1]}: Timeout occurred while waiting for the element"
             )
+
+    def get_hash_await(self, url, locator, timeout=5):
+        """
+        Navigate to a hash route of a single-page app and wait for the element located by locator to update.
+
+        If the app shell is already loaded, only `location.hash` is changed so the page is not reloaded.
+        Otherwise this falls back to a full navigation with get_await.
+
+        :param url: The URL to navigate to, including the hash route (e.g. 'https://host/#/route').
+        :type url: str
+        :param locator: A tuple with two elements (By, value) specifying the element locator.
+                        Example: (By.ID, 'element_id')
+        :type locator: tuple
+        :param timeout: Maximum number of seconds to wait for the element.
+        :type timeout: float
+        """
+        if not isinstance(locator, tuple) or len(locator) != 2:
+            raise ValueError("Locator should be a tuple with 2 arguments (By, value)")
+
+        base_url, _, route = url.partition("#")
+
+        # A full page load is needed unless the same app shell is already open
+        if not self.current_url.startswith(base_url + "#"):
+            return self.get_await(url=url, locator=locator, timeout=timeout)
+        if self.current_url == url:
+            return
+
+        # Remember the current content to detect when the app has rendered the new route
+        try:
+            previous_text = self.find_element(*locator).text
+        except NoSuchElementException:
+            previous_text = None
+
+        def is_element_updated(driver):
+            try:
+                text = driver.find_element(*locator).text
+            except (NoSuchElementException, StaleElementReferenceException):
+                return False
+            return bool(text) and text != previous_text
+
+        # Change only the hash so the app routes without reloading the document
+        self.execute_script("window.location.hash = arguments[0];", route)
+
+        try:
+            WebDriverWait(self, timeout, poll_frequency=POLL_FREQUENCY).until(
+                is_element_updated
+            )
+        except TimeoutException:
+            logger.warning(
+                f"{locator[1]}: Timeout occurred while waiting for the element to update"
+            )
+
+
+class DriverPool:
+    """
+    Pool of reusable SeleniumDriver instances.
+
+    Drivers are launched on demand and kept warm after release, up to max_size idle drivers,
+    so consecutive scraping calls reuse running browsers instead of launching new ones.
+
+    :param max_size: The maximum number of idle drivers kept alive.
+    :type max_size: int
+    :param driver_kwargs: Keyword arguments passed to SeleniumDriver when launching a driver.
+    :type driver_kwargs: dict
+    """
+
+    def __init__(self, max_size=4, **driver_kwargs):
+        self.max_size = max_size
+        self.driver_kwargs = driver_kwargs
+        self._idle_drivers = queue.Queue(maxsize=max_size)
+
+    def acquire(self):
+        """
+        Take an idle driver from the pool, or launch a new one if none is idle.
+
+        :return: A driver which must be handed back with release().
+        :rtype: SeleniumDriver
+        """
+        try:
+            return self._idle_drivers.get_nowait()
+        except queue.Empty:
+            return SeleniumDriver(**self.driver_kwargs)
+
+    def release(self, driver):
+        """
+        Return a driver to the pool, quitting it if the pool already holds max_size idle drivers.
+
+        :param driver: The driver obtained from acquire().
+        :type driver: SeleniumDriver
+        """
+        try:
+            self._idle_drivers.put_nowait(driver)
+        except queue.Full:
+            driver.quit()
+
+    @contextmanager
+    def borrow(self):
+        """
+        Acquire a driver for the duration of a 'with' block and release it afterwards.
+
+        The driver is held at one 'with' level while borrowed, so code using it in its own
+        'with' statement (e.g. scrape_word) does not quit the pooled driver.
+
+        :return: A context manager yielding a driver from the pool.
+        :rtype: contextmanager
+        """
+        driver = self.acquire()
+        driver._with_depth += 1
+        try:
+            yield driver
+        finally:
+            driver._with_depth -= 1
+            self.release(driver)
+
+    def close(self):
+        """Quit every idle driver in the pool."""
+        while True:
+            try:
+                self._idle_drivers.get_nowait().quit()
+            except queue.Empty:
+                break
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+# Shared pool so scraping calls within one process reuse warm browsers.
+# Drivers are only launched on demand, so max_size merely caps how many stay warm.
+driver_pool = DriverPool(max_size=MAX_BROWSER_WORKERS)
+atexit.register(driver_pool.close)
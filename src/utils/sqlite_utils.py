@@ -1,6 +1,152 @@
 import os
+import re
 import sqlite3
-from typing import List, Tuple, Dict, Optional, Union
+import threading
+from functools import lru_cache
+from typing import Callable, Iterator, List, Tuple, Dict, Optional, Union
+from utils.logger import logger
+
+
+# Tokens of a CREATE TABLE statement: quoted strings or identifiers, parentheses, commas, and other text
+_SQL_TOKEN_PATTERN = re.compile(r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|[(),]|[^'\"(),]+")
+
+# Keywords starting a table constraint rather than a column definition
+_TABLE_CONSTRAINTS = frozenset({"CONSTRAINT", "PRIMARY", "UNIQUE", "CHECK", "FOREIGN"})
+
+# Ways create_data can handle a record that already exists
+CONFLICT_POLICIES = ("fail", "ignore", "update")
+
+# Names valid as a bare ORDER BY term besides the schema columns: rowid aliases and keyword values
+ORDER_BY_NAMES = frozenset(
+    {
+        "rowid",
+        "oid",
+        "_rowid_",
+        "null",
+        "true",
+        "false",
+        "current_date",
+        "current_time",
+        "current_timestamp",
+    }
+)
+
+# Bound parameters per statement accepted by every SQLite build (SQLITE_MAX_VARIABLE_NUMBER before 3.32)
+MAX_QUERY_PARAMETERS = 999
+
+
+def _split_column_definitions(create_sql: str) -> List[str]:
+    """
+    Split the definitions inside the parentheses of a CREATE TABLE statement.
+
+    Commas nested in parentheses or quotes (e.g. DEFAULT '(x,y)' or CHECK(a IN (1,2))) do not split.
+
+    :param create_sql: The CREATE TABLE statement stored in sqlite_master.
+    :type create_sql: str
+    :return: The stripped column and table constraint definitions, in order.
+    :rtype: List[str]
+    """
+    definitions, current, depth = [], [], 0
+
+    for token in _SQL_TOKEN_PATTERN.findall(create_sql):
+        if token == "(":
+            depth += 1
+            if depth == 1:
+                continue
+        elif token == ")":
+            depth -= 1
+            if not depth:
+                break
+        elif token == "," and depth == 1:
+            definitions.append("".join(current).strip())
+            current = []
+            continue
+
+        if depth:
+            current.append(token)
+
+    definitions.append("".join(current).strip())
+    return [definition for definition in definitions if definition]
+
+
+@lru_cache(maxsize=128)
+def _conditions_sql(columns: Tuple[str, ...], separator: str = " AND ") -> str:
+    """
+    Build 'column = ?' terms joined by separator, cached per column tuple.
+
+    :param columns: The column names.
+    :type columns: Tuple[str, ...]
+    :param separator: The text between two terms, e.g. ', ' for a SET clause.
+    :type separator: str
+    :return: The joined terms.
+    :rtype: str
+    """
+    return separator.join([f"{column} = ?" for column in columns])
+
+
+@lru_cache(maxsize=64)
+def _insert_sql(table: str, columns: Tuple[str, ...], conflict_clause: str = "") -> str:
+    """
+    Build the INSERT statement of a table for the given columns, cached per column tuple.
+
+    :param table: The name of the table.
+    :type table: str
+    :param columns: The column names, in the order of the values.
+    :type columns: Tuple[str, ...]
+    :param conflict_clause: An optional clause appended to the statement, e.g. 'ON CONFLICT DO NOTHING'.
+    :type conflict_clause: str
+    :return: The INSERT statement with one placeholder per column.
+    :rtype: str
+    """
+    placeholders = ", ".join("?" * len(columns))
+    query = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"
+    return f"{query} {conflict_clause}" if conflict_clause else query
+
+
+@lru_cache(maxsize=64)
+def _upsert_sql(table: str, columns: Tuple[str, ...], conflict_column: str) -> str:
+    """
+    Build an INSERT statement that updates the existing record on conflict, cached per column tuple.
+
+    :param table: The name of the table.
+    :type table: str
+    :param columns: The column names, in the order of the values.
+    :type columns: Tuple[str, ...]
+    :param conflict_column: The unique column identifying an existing record.
+    :type conflict_column: str
+    :return: The INSERT ... ON CONFLICT statement.
+    :rtype: str
+    """
+    updates = ", ".join(
+        [
+            f"{column} = excluded.{column}"
+            for column in columns
+            if column != conflict_column
+        ]
+    )
+    action = f"DO UPDATE SET {updates}" if updates else "DO NOTHING"
+    return _insert_sql(table, columns, f"ON CONFLICT({conflict_column}) {action}")
+
+
+@lru_cache(maxsize=64)
+def _update_sql(
+    table: str, set_columns: Tuple[str, ...], where_columns: Tuple[str, ...]
+) -> str:
+    """
+    Build the UPDATE statement of a table for the given columns, cached per column tuples.
+
+    :param table: The name of the table.
+    :type table: str
+    :param set_columns: The columns to update, in the order of the values.
+    :type set_columns: Tuple[str, ...]
+    :param where_columns: The columns compared for equality in the WHERE clause.
+    :type where_columns: Tuple[str, ...]
+    :return: The UPDATE statement.
+    :rtype: str
+    """
+    set_clause = _conditions_sql(set_columns, ", ")
+    where_clause = _conditions_sql(where_columns)
+    return f"UPDATE {table} SET {set_clause} WHERE {where_clause}"
 
 
 class SQLiteDB:
@@ -11,6 +157,18 @@ class SQLiteDB:
     :type db_path: str
     """
 
+    # Pragmas applied to every new connection. Syncing only at WAL checkpoints keeps
+    # commits cheap, and temporary tables and a 20 MB page cache stay in memory
+    CONNECTION_PRAGMAS = (
+        "PRAGMA synchronous=NORMAL;"
+        "PRAGMA temp_store=MEMORY;"
+        "PRAGMA cache_size=-20000;"
+    )
+
+    # Number of prepared statements kept per connection (sqlite3 defaults to 128).
+    # Queries are built from a few templates, so repeated SQL text skips parsing and planning
+    CACHED_STATEMENTS = 256
+
     def __init__(self, db_path: str):
         """
         Initialize the SQLiteDB instance.
@@ -20,24 +178,78 @@ class SQLiteDB:
         """
         self.path = db_path
         self._check_db_exist()
-        self.connections = []  # Prevent Overwritten Connection When nested
+        self._enable_wal()
+        self._conn = None  # Opened on the first 'with' block and kept until close()
+        self._depth = 0  # Counter to track the depth of nested 'with' statements
+        # Held by the thread inside a 'with' block, so threads take turns on the shared connection
+        self._lock = threading.RLock()
 
     def _check_db_exist(self):
         """Check if the SQLite database file exists."""
         if not os.path.isfile(self.path):
             raise ValueError(f"The database file '{self.path}' does not exist.")
 
+    def _enable_wal(self):
+        """
+        Switch the database to write-ahead logging.
+
+        The journal mode is stored in the database file, so it only needs to be set once.
+        Readers no longer block writers, and a commit appends to the log instead of rewriting pages.
+        """
+        conn = sqlite3.connect(self.path)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+        finally:
+            conn.close()
+
+    def _connect(self):
+        """
+        Return the shared connection, opening it on first use.
+
+        :return: The SQLite connection.
+        :rtype: sqlite3.Connection
+        """
+        if self._conn is None:
+            # Transactions are opened and closed explicitly by the outermost 'with' block.
+            # Any thread may use the connection, as access is serialized by self._lock
+            self._conn = sqlite3.connect(
+                self.path,
+                cached_statements=self.CACHED_STATEMENTS,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            self._conn.executescript(self.CONNECTION_PRAGMAS)
+        return self._conn
+
+    def close(self):
+        """Close the shared connection. A later 'with' block opens a new one."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
     def __enter__(self):
         """
         Class Method which is called when entering a 'with' block and returns connection and cursor.
 
+        All blocks share one long-lived connection, so queries do not reopen the database file.
+        The outermost block begins a transaction that every statement of the nested blocks joins,
+        so statements run in one 'with' block are committed together.
+        Other threads wait until the outermost block of the current thread exits.
+
         :return: Tuple containing the SQLite connection and cursor.
         :rtype: tuple
         """
-        conn = sqlite3.connect(self.path)
-        cursor = conn.cursor()
-        self.connections.append((conn, cursor))
-        return conn, cursor
+        self._lock.acquire()
+        try:
+            conn = self._connect()
+            if not self._depth:
+                conn.execute("BEGIN")
+        except BaseException:
+            self._lock.release()
+            raise
+        self._depth += 1
+        return conn, conn.cursor()
 
     def __exit__(self, exc_type, exc_value, traceback):
         """
@@ -51,13 +263,14 @@ class SQLiteDB:
         :return: True if no exception should propagate, False otherwise.
         :rtype: bool
         """
-        if self.connections:
-            conn, _ = self.connections.pop()
-            if exc_type is None:
-                conn.commit()
-            else:
-                conn.rollback()
-            conn.close()
+        self._depth -= 1
+
+        try:
+            # Only the outermost block ends the transaction. The connection stays open for reuse
+            if not self._depth and self._conn is not None and self._conn.in_transaction:
+                self._conn.execute("COMMIT" if exc_type is None else "ROLLBACK")
+        finally:
+            self._lock.release()
 
         return exc_type is None
 
@@ -89,6 +302,48 @@ class SQLiteDB:
 
             return result
 
+    def iter_query(
+        self, query: str, params: Optional[Tuple] = None, chunk_size: int = 1024
+    ) -> Iterator[Dict[str, Union[int, str]]]:
+        """
+        Run a custom query on the database and yield its rows as they are fetched.
+
+        Rows are fetched chunk_size at a time, so large results are never held in memory at once.
+        The rows are read by a cursor of their own, outside the transaction of the 'with' blocks,
+        so writes made while iterating are committed by their own blocks, even if the loop stops early.
+
+        :param query: Custom SQL query.
+        :type query: str
+        :param params: Optional parameters for the query.
+        :type params: Optional[Tuple]
+        :param chunk_size: Number of rows fetched per round.
+        :type chunk_size: int
+
+        :return: Iterator of dictionaries representing the rows of the query.
+        :rtype: Iterator[Dict[str, Union[int, str]]]
+        """
+        # The lock is only held while talking to SQLite, never while the caller handles a row
+        with self._lock:
+            cursor = self._connect().cursor()
+            cursor.arraysize = chunk_size
+            cursor.execute(query, params or ())
+
+        try:
+            if cursor.description is None:
+                return
+
+            columns = [column[0] for column in cursor.description]
+            while True:
+                with self._lock:
+                    rows = cursor.fetchmany()
+                if not rows:
+                    break
+                for row in rows:
+                    yield dict(zip(columns, row))
+        finally:
+            with self._lock:
+                cursor.close()
+
 
 class SQLiteTable:
     """
@@ -100,48 +355,147 @@ class SQLiteTable:
     :type tb_name: str
     :param schema: Table schema defined as a dictionary.
     :type schema: Dict[str, str]
+    :param on_conflict: What create_data does with a record that already exists:
+                        'fail' raises ValueError, 'ignore' keeps the existing record
+                        and 'update' overwrites it. A callable receives the data and the
+                        sqlite3.IntegrityError and returns one of these policies.
+    :type on_conflict: Union[str, Callable]
+    :param conflict_column: The unique column identifying an existing record for 'update'.
+                            If None, the first UNIQUE column of the schema is used,
+                            or else its PRIMARY KEY column.
+    :type conflict_column: str, optional
     """
 
     def __init__(
-        self, db: SQLiteDB, tb_name: str, schema: Optional[Dict[str, str]] = None
+        self,
+        db: SQLiteDB,
+        tb_name: str,
+        schema: Optional[Dict[str, str]] = None,
+        on_conflict: Union[str, Callable] = "fail",
+        conflict_column: Optional[str] = None,
     ):
+        if not callable(on_conflict) and on_conflict not in CONFLICT_POLICIES:
+            raise ValueError(
+                f"on_conflict should be a callable or one of {', '.join(CONFLICT_POLICIES)}"
+            )
+
         self.db = db
         self.name = tb_name
         self.schema = schema
+        self.on_conflict = on_conflict
         self._validate_schema()
+
+        # Resolve the column upserts are keyed on, now that the schema is known
+        if conflict_column is None:
+            conflict_column = self._infer_conflict_column()
+        elif conflict_column.lower() not in self._schema_columns:
+            raise ValueError(f"No such column: {conflict_column}")
+        if conflict_column is None and on_conflict == "update":
+            raise ValueError(
+                "on_conflict 'update' needs a conflict_column or a UNIQUE or PRIMARY KEY column in the schema"
+            )
+        self.conflict_column = conflict_column
+
         self._assign_table()
 
     def create_data(self, data: Dict[str, Union[int, str]]):
         """
         Create a new record in the table.
 
+        An existing record is handled according to the on_conflict policy of the table.
+
         :param data: Data for the new record.
         :type data: Dict[str, Union[int, str]]
-        """
-        columns = ", ".join(data.keys())
-        values = ", ".join(["?" for _ in data])
 
-        query = f"INSERT INTO {self.name} ({columns}) VALUES ({values})"
+        :raises ValueError: If the record already exists and the policy is 'fail'.
+        :raises sqlite3.Error: If the record violates another constraint or cannot be updated.
+        """
+        # Known policies are resolved by SQLite itself within the INSERT statement
+        if self.on_conflict == "update":
+            return self.upsert(data, self.conflict_column)
+        # Unlike INSERT OR IGNORE, ON CONFLICT DO NOTHING still fails on NOT NULL and CHECK violations
+        conflict_clause = "ON CONFLICT DO NOTHING" if self.on_conflict == "ignore" else ""
+        query = _insert_sql(self.name, tuple(data), conflict_clause)
         try:
             self.db.run_query(query, tuple(data.values()))
         except sqlite3.IntegrityError as e:
-            # Handle unique constraint violation
-            if "UNIQUE constraint failed" in str(e):
-                print(f"The data already exists in DB({self.db.path})")
-                user_response = input(
-                    "Do you want to update the existing record? (y/n): "
-                ).lower()
-
-                if user_response in ["y", ""]:
-                    try:
-                        # Attempt to update the existing record
-                        self.update_data(data, {"hanja": data["hanja"]})
-                    except ValueError as update_error:
-                        print(f"Error updating data: {update_error}")
+            # Only unique constraint violations are handled by the policy
+            if "UNIQUE constraint failed" not in str(e):
+                logger.error(f"Error creating data in {self.name}: {e}")
+                raise
+
+            action = self.on_conflict
+            if callable(action):
+                action = action(data, e)
+
+            if action == "update":
+                try:
+                    # Update the existing record
+                    self.upsert(data, self.conflict_column)
+                except sqlite3.Error as update_error:
+                    logger.error(f"Error updating data in {self.name}: {update_error}")
+                    raise
+            elif action != "ignore":
+                raise ValueError(
+                    f"The data already exists in DB({self.db.path})"
+                ) from e
+
+    def create_many(self, data_list: List[Dict[str, Union[int, str]]]):
+        """
+        Create several new records in the table in a single transaction.
+
+        Records with the same columns share one INSERT statement executed with executemany.
+
+        :param data_list: Data for the new records.
+        :type data_list: List[Dict[str, Union[int, str]]]
+
+        :raises sqlite3.IntegrityError: If a record violates a constraint. No record is created then.
+                                        Existing records are skipped instead if the on_conflict
+                                        policy of the table is 'ignore', and updated if it is 'update';
+                                        other violations, such as NOT NULL, are always raised.
+        """
+        # Group the records by their columns, keeping the order in which they appear
+        groups = {}
+        for data in data_list:
+            groups.setdefault(tuple(data.keys()), []).append(tuple(data.values()))
+
+        conflict_clause = "ON CONFLICT DO NOTHING" if self.on_conflict == "ignore" else ""
+        with self.db as (_, cursor):
+            for columns, rows in groups.items():
+                if self.on_conflict == "update":
+                    query = _upsert_sql(self.name, columns, self.conflict_column)
                 else:
-                    print("Aborting procedure. No changes made.")
-            else:
-                print(f"Error: {e}")
+                    query = _insert_sql(self.name, columns, conflict_clause)
+                cursor.executemany(query, rows)
+
+    def upsert(
+        self, data: Dict[str, Union[int, str]], conflict_column: Optional[str] = None
+    ):
+        """
+        Create a record, or update the existing record with the same value in conflict_column.
+
+        Both cases are handled by a single INSERT ... ON CONFLICT DO UPDATE statement.
+
+        :param data: Data for the record.
+        :type data: Dict[str, Union[int, str]]
+        :param conflict_column: The unique column identifying an existing record.
+                                Defaults to the conflict column of the table.
+        :type conflict_column: str, optional
+        """
+        if conflict_column is None:
+            conflict_column = self.conflict_column
+        if conflict_column is None:
+            raise ValueError(
+                f"The table '{self.name}' has no conflict column to upsert on"
+            )
+
+        if conflict_column not in data:
+            raise ValueError(
+                f"data should contain the conflict column '{conflict_column}'"
+            )
+
+        query = _upsert_sql(self.name, tuple(data), conflict_column)
+        self.db.run_query(query, tuple(data.values()))
 
     def read_data(
         self,
@@ -166,24 +520,8 @@ class SQLiteTable:
         :rtype: List[Dict[str, Union[int, str]]]
         """
 
-        # Helper function to validate columns
-        def validate_columns(columns):
-            for column in columns:
-                if column.lower() != "*" and column.lower() not in self.schema:
-                    raise ValueError(f"No such column: {column}")
-
         # Validate select_list
-        if isinstance(select_list, list):
-            validate_columns(select_list)
-            select_list = ", ".join(select_list)
-        elif isinstance(select_list, str):
-            columns = [col.strip() for col in select_list.split(",")]
-            validate_columns(columns)
-            select_list = ", ".join(columns)
-        else:
-            raise ValueError(
-                "Invalid select_list format. Should be a list or a string."
-            )
+        select_list = self._format_select_list(select_list)
 
         # Validate where_condition
         if where_condition and not isinstance(where_condition, dict):
@@ -191,25 +529,34 @@ class SQLiteTable:
 
         where_clause, where_values = "", ()
         if where_condition:
-            where_clause = "WHERE " + " AND ".join(
-                [f"{column} = ?" for column in where_condition.keys()]
-            )
+            where_clause = "WHERE " + _conditions_sql(tuple(where_condition))
             where_values = tuple(where_condition.values())
 
-        # Validate order_by_expression
+        # Validate order_by_direction
+        if order_by_direction and order_by_direction.upper() not in ("ASC", "DESC"):
+            raise ValueError("order_by_direction should be 'ASC' or 'DESC'")
+
+        # Validate the terms of order_by_expression that are a bare column name (e.g. 'grade DESC').
+        # Other expressions (e.g. 'length(hanja)' or 'CASE WHEN ...') are checked by SQLite
+        # when the query runs
         if order_by_expression:
-            # Attempt to execute a query with the ORDER BY expression to catch any errors
-            try:
-                self.db.run_query(
-                    f"SELECT * FROM {self.name} ORDER BY {order_by_expression} LIMIT 1"
-                )
-            except sqlite3.Error as e:
-                raise ValueError(f"Invalid ORDER BY expression: {e}")
+            for term in order_by_expression.split(","):
+                words = term.split()
+                if len(words) == 2 and words[1].upper() in ("ASC", "DESC"):
+                    words.pop()
+                if len(words) != 1 or not words[0].isidentifier():
+                    continue
+
+                column = words[0].lower()
+                if column not in self._schema_columns and column not in ORDER_BY_NAMES:
+                    raise ValueError(
+                        f"Invalid ORDER BY expression: no such column: {words[0]}"
+                    )
 
         # Construct the SELECT statement
         select_clause = f"SELECT {select_list}"
         order_by_clause = (
-            f"ORDER BY {order_by_expression} {order_by_direction}"
+            f"ORDER BY {order_by_expression} {order_by_direction or ''}"
             if order_by_expression
             else ""
         )
@@ -217,7 +564,53 @@ class SQLiteTable:
         query = f"{select_clause} FROM {self.name} {where_clause} {order_by_clause}"
 
         # Execute the query
-        return self.db.run_query(query, where_values)
+        try:
+            return self.db.run_query(query, where_values)
+        except sqlite3.Error as e:
+            if order_by_expression:
+                raise ValueError(f"Invalid ORDER BY expression: {e}")
+            raise
+
+    def read_in(
+        self,
+        column: str,
+        values: List[Union[int, str]],
+        select_list: Union[List[str], str] = "*",
+    ) -> List[Dict[str, Union[int, str]]]:
+        """
+        Retrieve the records whose column holds one of the given values.
+
+        All values are looked up with one 'column IN (...)' query instead of one read_data call each.
+        Values beyond the SQLite parameter limit are queried in further chunks of the same transaction.
+
+        :param column: Column to compare with the values.
+        :type column: str
+        :param values: Values to look up.
+        :type values: List[Union[int, str]]
+        :param select_list: List of columns to select or '*' to select all columns.
+        :type select_list: Union[list, str]
+
+        :return: List of dictionaries representing the records.
+        :rtype: List[Dict[str, Union[int, str]]]
+        """
+        if column.lower() not in self._schema_columns:
+            raise ValueError(f"No such column: {column}")
+        select_list = self._format_select_list(select_list)
+
+        # Duplicate values would return the same records again when they fall into different chunks
+        values = tuple(dict.fromkeys(values))
+
+        result = []
+        with self.db as (_, cursor):
+            for start in range(0, len(values), MAX_QUERY_PARAMETERS):
+                chunk = values[start : start + MAX_QUERY_PARAMETERS]
+                placeholders = ", ".join("?" * len(chunk))
+                query = f"SELECT {select_list} FROM {self.name} WHERE {column} IN ({placeholders})"
+                cursor.execute(query, chunk)
+                columns = [description[0] for description in cursor.description]
+                result.extend(dict(zip(columns, row)) for row in cursor.fetchall())
+
+        return result
 
     def update_data(
         self,
@@ -240,18 +633,8 @@ class SQLiteTable:
         if where_condition and not isinstance(where_condition, dict):
             raise ValueError("where_condition must be a dictionary")
 
-        # Construct the SET clause for the UPDATE statement
-        set_clause = ", ".join([f"{column} = ?" for column in new_data.keys()])
-
-        # Construct the WHERE clause for the UPDATE statement
-        where_clause = ""
-        if where_condition:
-            where_clause = " AND ".join(
-                [f"{column} = ?" for column in where_condition.keys()]
-            )
-
         # Construct the UPDATE statement
-        query = f"UPDATE {self.name} SET {set_clause} WHERE {where_clause}"
+        query = _update_sql(self.name, tuple(new_data), tuple(where_condition or ()))
 
         try:
             # Execute the UPDATE statement
@@ -287,9 +670,7 @@ class SQLiteTable:
 
         if response in ["y", ""]:
             # Construct the WHERE clause for the DELETE statement
-            where_clause = " AND ".join(
-                [f"{column} = ?" for column in where_condition.keys()]
-            )
+            where_clause = _conditions_sql(tuple(where_condition))
 
             # Construct the DELETE statement
             query = f"DELETE FROM {self.name} WHERE {where_clause}"
@@ -302,6 +683,51 @@ class SQLiteTable:
         else:
             print("Deletion aborted. No changes made.")
 
+    def _format_select_list(self, select_list: Union[List[str], str]) -> str:
+        """
+        Validate the columns of a select list against the schema and join them for a SELECT statement.
+
+        :param select_list: List of columns to select or '*' to select all columns.
+        :type select_list: Union[list, str]
+
+        :raises ValueError: If a column is not in the schema or select_list has an invalid format.
+        :return: The comma-separated select list.
+        :rtype: str
+        """
+        if isinstance(select_list, list):
+            columns = select_list
+        elif isinstance(select_list, str):
+            columns = [col.strip() for col in select_list.split(",")]
+        else:
+            raise ValueError(
+                "Invalid select_list format. Should be a list or a string."
+            )
+
+        for column in columns:
+            if column != "*" and column.lower() not in self._schema_columns:
+                raise ValueError(f"No such column: {column}")
+
+        return ", ".join(columns)
+
+    def _infer_conflict_column(self) -> Optional[str]:
+        """
+        Find the column identifying an existing record from the schema.
+
+        UNIQUE columns are preferred over the PRIMARY KEY, which is often an AUTOINCREMENT id
+        missing from the data to insert.
+
+        :return: The first UNIQUE column, else the PRIMARY KEY column, or None if there is neither.
+        :rtype: Optional[str]
+        """
+        primary_key = None
+        for column, options in self.schema.items():
+            keywords = options.upper().split()
+            if "UNIQUE" in keywords:
+                return column
+            if primary_key is None and "PRIMARY" in keywords:
+                primary_key = column
+        return primary_key
+
     def _validate_schema(self):
         """
         Validate the provided table schema.
@@ -317,6 +743,7 @@ class SQLiteTable:
         if self.schema is None:
             # Retrieve the existing schema from the database
             self.schema = self._get_existing_schema()
+            self._schema_columns = frozenset(map(str.lower, self.schema))
             return True
 
         # Ensure that schema is a dictionary and contains at least one item
@@ -336,9 +763,11 @@ class SQLiteTable:
                 )
             valid_columns.add(column.lower())  # Use lowercase names
 
+        # Lowercase column names, computed once for the column checks of every query
+        self._schema_columns = frozenset(map(str.lower, self.schema))
+
         # Check if all columns in the schema are valid
-        schema_columns = set(column.lower() for column in self.schema.keys())
-        invalid_columns = schema_columns - valid_columns
+        invalid_columns = self._schema_columns - valid_columns
         if invalid_columns:
             raise ValueError(
                 f"Invalid columns in the schema: {', '.join(invalid_columns)}"
@@ -373,6 +802,18 @@ class SQLiteTable:
 
         :raises ValueError: If an error occurs while fetching the existing schema.
         """
+        existing_schema = self._fetch_existing_schema()
+        if existing_schema is None:
+            raise ValueError(f"The table '{self.name}' does not exist.")
+        return existing_schema
+
+    def _fetch_existing_schema(self):
+        """
+        Fetch the existing schema of the table with a single query on sqlite_master.
+
+        :return: Dictionary representing the existing schema, or None if the table does not exist.
+        :rtype: Optional[Dict[str, str]]
+        """
         with self.db as (_, cursor):
             # Get the SQL statement used to create the table from sqlite_master
             cursor.execute(
@@ -381,23 +822,18 @@ class SQLiteTable:
             )
             query = cursor.fetchone()
 
-            if query:
-                # Extract the part of the SQL statement that defines the columns
-                columns_definition = query[0].split("(")[1].split(")")[0].strip()
-                columns_list = [col.strip() for col in columns_definition.split(",")]
-
-                # Construct the existing schema dictionary
-                existing_schema = {}
-                for col in columns_list:
-                    parts = col.split(" ")
-                    col_name = parts[0]
-                    col_type = " ".join(parts[1:])
-                    existing_schema[col_name] = col_type
+        if query is None:
+            return None
 
-                return existing_schema
+        # Construct the existing schema dictionary from the column definitions
+        existing_schema = {}
+        for col in _split_column_definitions(query[0]):
+            col_name, _, col_type = col.partition(" ")
+            if col_name.partition("(")[0].upper() in _TABLE_CONSTRAINTS:
+                continue
+            existing_schema[col_name] = col_type
 
-            else:
-                raise ValueError(f"The table '{self.name}' does not exist.")
+        return existing_schema
 
     def _are_schemas_compatible(self, existing_schema, provided_schema):
         """
@@ -456,287 +892,73 @@ class SQLiteTable:
 
         :raises ValueError: If an error occurs during table assignment.
         """
-        with self.db as (_, cursor):
-            # Check if the table already exists
-            cursor.execute(
-                f"SELECT name FROM sqlite_master WHERE type='table' AND name=?;",
-                (self.name,),
-            )
-            existing_table = cursor.fetchone()
-
-            if existing_table is None:
-                # Table does not exist, create it
-                if self.schema is not None:
-                    self._create_table()
-                else:
-                    raise ValueError(
-                        f"The table '{self.name}' does not exist, and schema is not provided."
-                    )
+        # A missing table has no row in sqlite_master, so one query both checks and reads it
+        existing_schema = self._fetch_existing_schema()
 
+        if existing_schema is None:
+            # Table does not exist, create it
+            if self.schema is not None:
+                self._create_table()
             else:
-                # Table exists
-                existing_schema = self._get_existing_schema()
-                if self.schema is not None:
-                    # Schema is provided, check for compatibility
-                    if not self._are_schemas_compatible(existing_schema, self.schema):
-                        raise ValueError(
-                            "The provided schema is not compatible with the existing table."
-                        )
-
-
-class SQLiteTable:
-    """
-    Initialize the SQLiteTable instance.
-
-    :param db: SQLiteDB instance.
-    :type db: SQLiteDB
-    :param tb_name: Name of the table.
-    :type tb_name: str
-    :param schema: Table schema defined as a dictionary.
-    :type schema: Dict[str, str]
-    """
-
-    def __init__(
-        self, db: SQLiteDB, tb_name: str, schema: Optional[Dict[str, str]] = None
-    ):
-        self.db = db
-        self.name = tb_name
-        self.schema = schema
-        self._validate_schema()
-        self._assign_table()
-
-    def create(self, data: Dict[str, Union[int, str]]):
-        """
-        Create a new record in the table.
-
-        :param data: Data for the new record.
-        :type data: Dict[str, Union[int, str]]
-        """
-        columns = ", ".join(data.keys())
-        values = ", ".join(["?" for _ in data])
-
-        query = f"INSERT INTO {self.name} ({columns}) VALUES ({values})"
-        self.db.run_query(query, tuple(data.values()))
-
-    def _validate_schema(self):
-        """
-        Validate the provided table schema.
-
-        Ensure that schema is a dictionary and contains at least one item.
-        Validate the schema by ensuring that all columns have valid data types.
-
-        :raises ValueError: If the schema is invalid.
-        """
-        if self.schema is not None:
-            # Ensure that schema is a dictionary and contains at least one item
-            if not isinstance(self.schema, dict) or not self.schema:
-                raise ValueError("Invalid schema. It should be a non-empty dictionary.")
-
-            # Validate the schema by ensuring that all columns have valid data types
-            data_types = {"INTEGER", "TEXT", "REAL", "BLOB", "NULL"}
-            valid_columns = set()
-
-            for column, options in self.schema.items():
-                # Check if the column type is valid
-                data_type = options.split()[0]
-                if data_type not in data_types:
-                    raise ValueError(
-                        f"Invalid data type '{data_type}' for column '{column}' in the table schema."
-                    )
-                valid_columns.add(column.lower())  # Use lowercase names
-
-            # Check if all columns in the schema are valid
-            schema_columns = set(column.lower() for column in self.schema.keys())
-            invalid_columns = schema_columns - valid_columns
-            if invalid_columns:
                 raise ValueError(
-                    f"Invalid columns in the schema: {', '.join(invalid_columns)}"
+                    f"The table '{self.name}' does not exist, and schema is not provided."
                 )
 
-    def _create_table(self):
-        """
-        Create the table in the SQLite database.
-
-        Uses the provided schema to construct the CREATE TABLE SQL statement and execute it.
-
-        :raises ValueError: If an error occurs during table creation.
-        """
-        with self.db as (_, cursor):
-            # Construct the CREATE TABLE SQL statement
-            columns_str = ", ".join(
-                [f"{column} {options}" for column, options in self.schema.items()]
-            )
-            query = f"CREATE TABLE IF NOT EXISTS {self.name} ({columns_str})"
-
-            # Execute the SQL statement
-            cursor.execute(query)
-
-    def _get_existing_schema(self):
-        """
-        Retrieve the existing schema of the table from the SQLite database.
-
-        :return: Dictionary representing the existing schema.
-        :rtype: Dict[str, str]
-
-        :raises ValueError: If an error occurs while fetching the existing schema.
-        """
-        with self.db as (_, cursor):
-            # Get the SQL statement used to create the table from sqlite_master
-            cursor.execute(
-                f"SELECT sql FROM sqlite_master WHERE type='table' AND name=?;",
-                (self.name,),
-            )
-            query = cursor.fetchone()
-
-            if query:
-                # Extract the part of the SQL statement that defines the columns
-                columns_definition = query[0].split("(")[1].split(")")[0].strip()
-                columns_list = [col.strip() for col in columns_definition.split(",")]
-
-                # Construct the existing schema dictionary
-                existing_schema = {}
-                for col in columns_list:
-                    parts = col.split(" ")
-                    col_name = parts[0]
-                    col_type = " ".join(parts[1:])
-                    existing_schema[col_name] = col_type
-
-                return existing_schema
-
-            else:
-                raise ValueError(f"The table '{self.name}' does not exist.")
-
-    def _are_schemas_compatible(self, existing_schema, provided_schema):
-        """
-        Check if the provided schema is compatible with the existing schema.
-
-        :param existing_schema: Existing schema retrieved from the database.
-        :type existing_schema: Dict[str, str]
-        :param provided_schema: Schema provided during table instantiation.
-        :type provided_schema: Dict[str, str]
-
-        :raises ValueError: If schemas are not compatible.
-        :return: True if schemas are compatible, False otherwise.
-        :rtype: bool
-        """
-        if existing_schema != provided_schema:
-            existing_columns = set(existing_schema.keys())
-            provided_columns = set(provided_schema.keys())
-
-            # Identify columns present in the provided schema but not in the existing schema
-            new_columns = provided_columns - existing_columns
-            if new_columns:
+        elif self.schema is not None:
+            # Table exists and schema is provided, check for compatibility
+            if not self._are_schemas_compatible(existing_schema, self.schema):
                 raise ValueError(
-                    f"The provided schema has new columns: {', '.join(new_columns)}"
+                    "The provided schema is not compatible with the existing table."
                 )
 
-            # Identify columns present in the existing schema but not in the provided schema
-            missing_columns = existing_columns - provided_columns
-            if missing_columns:
-                raise ValueError(
-                    f"The provided schema is missing columns: {', '.join(missing_columns)}"
-                )
-
-            # Identify columns with different data types in the provided and existing schemas
-            different_data_types = {
-                column: (existing_schema[column], provided_schema[column])
-                for column in existing_columns & provided_columns
-                if existing_schema[column] != provided_schema[column]
-            }
-
-            if different_data_types:
-                messages = [
-                    f"Column '{column}' has different data types: Existing: {existing_schema[column]}, Provided: {provided_schema[column]}"
-                    for column in different_data_types
-                ]
-                raise ValueError("\n".join(messages))
-            # Schemas are compatible if no differences are found
-            return True
-        return True
 
-    def _assign_table(self):
-        """
-        Assign the table to the SQLite database.
-
-        Check if the table already exists. If not, create it using the provided schema.
-        If the table exists, validate the compatibility of the existing schema with the provided schema.
-
-        :raises ValueError: If an error occurs during table assignment.
-        """
-        with self.db as (_, cursor):
-            # Check if the table already exists
-            cursor.execute(
-                f"SELECT name FROM sqlite_master WHERE type='table' AND name=?;",
-                (self.name,),
-            )
-            existing_table = cursor.fetchone()
-
-            if existing_table is None:
-                # Table does not exist, create it
-                if self.schema is not None:
-                    self._create_table(self.name, self.schema)
-                else:
-                    raise ValueError(
-                        f"The table '{self.name}' does not exist, and schema is not provided."
-                    )
-
-            else:
-                # Table exists
-                existing_schema = self._get_existing_schema()
-                if self.schema is not None:
-                    # Schema is provided, check for compatibility
-                    if not self._are_schemas_compatible(existing_schema, self.schema):
-                        raise ValueError(
-                            "The provided schema is not compatible with the existing table."
-                        )
-
-
-# Schema Definition for the 'hanjas' table
-hanja_schema = {
-    "id": "INTEGER PRIMARY KEY AUTOINCREMENT",
-    "hanja": "TEXT NOT NULL UNIQUE",
-    "meaning": "TEXT NOT NULL",
-    "meaning_official": "TEXT",
-    "radical": "TEXT",
-    "stroke_count": "INTEGER",
-    "formation_letter": "TEXT",
-    "grade": "INTEGER",
-    "usage": "TEXT",
-    "unicode": "TEXT",
-    "reference_idx": "TEXT",
-    "naver_dict_update_date": "TEXT",
-    "naver_hanja_id": "TEXT",
-}
-
-# Sample hanja data
-hanja_data = {
-    "hanja": "示",
-    "meaning": "볼 시",
-    "meaning_official": "볼 시",
-    "radical": "⺭",
-    "stroke_count": 5,
-    "formation_letter": "二+小",
-    "grade": 5,
-    "usage": "중학용,읽기5급,쓰기4급,대법원인명용",
-    "unicode": "U+793A",
-    "reference_idx": "1_137",
-    "naver_dict_update_date": "2024-01-21",
-    "naver_hanja_id": "2367ab9f300841eebcb8a76db1f91654",
-}
-
-# Create SQLiteDB and SQLiteTable Instances
-hanja_db = SQLiteDB("data/db/hanja.db")
-hanja_table = SQLiteTable(hanja_db, "hanjas", hanja_schema)
-
-""" # Insert a row into the 'hanjas' table
-hanja_table.create_data(hanja_data)
-
-# Retrieve all rows from the 'hanjas' table
-result = hanja_table.read_data(["hanja", "meaning", "grade"])
-print(result) """
-
-""" # Update a record in 'hanjas' table
-hanja_table.update_data({"meaning": "빌 시", "stroke_count": 3}, {"hanja": "示"})
-print(hanja_table.read_data(select_list=["id", "hanja", "meaning"])) """
-
-hanja_table.delete_data({"hanja": "視"})
+if __name__ == "__main__":
+    # Schema Definition for the 'hanjas' table
+    hanja_schema = {
+        "id": "INTEGER PRIMARY KEY AUTOINCREMENT",
+        "hanja": "TEXT NOT NULL UNIQUE",
+        "meaning": "TEXT NOT NULL",
+        "meaning_official": "TEXT",
+        "radical": "TEXT",
+        "stroke_count": "INTEGER",
+        "formation_letter": "TEXT",
+        "grade": "INTEGER",
+        "usage": "TEXT",
+        "unicode": "TEXT",
+        "reference_idx": "TEXT",
+        "naver_dict_update_date": "TEXT",
+        "naver_hanja_id": "TEXT",
+    }
+
+    # Sample hanja data
+    hanja_data = {
+        "hanja": "示",
+        "meaning": "볼 시",
+        "meaning_official": "볼 시",
+        "radical": "⺭",
+        "stroke_count": 5,
+        "formation_letter": "二+小",
+        "grade": 5,
+        "usage": "중학용,읽기5급,쓰기4급,대법원인명용",
+        "unicode": "U+793A",
+        "reference_idx": "1_137",
+        "naver_dict_update_date": "2024-01-21",
+        "naver_hanja_id": "2367ab9f300841eebcb8a76db1f91654",
+    }
+
+    # Create SQLiteDB and SQLiteTable Instances
+    hanja_db = SQLiteDB("data/db/hanja.db")
+    hanja_table = SQLiteTable(hanja_db, "hanjas", hanja_schema)
+
+    """ # Insert a row into the 'hanjas' table
+    hanja_table.create_data(hanja_data)
+
+    # Retrieve all rows from the 'hanjas' table
+    result = hanja_table.read_data(["hanja", "meaning", "grade"])
+    print(result) """
+
+    """ # Update a record in 'hanjas' table
+    hanja_table.update_data({"meaning": "빌 시", "stroke_count": 3}, {"hanja": "示"})
+    print(hanja_table.read_data(select_list=["id", "hanja", "meaning"])) """
+
+    hanja_table.delete_data({"hanja": "視"})
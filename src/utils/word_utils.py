@@ -1,3 +1,9 @@
+import re
+
+# A non-empty word without any whitespace or newline characters
+_SINGLE_WORD_PATTERN = re.compile(r"\S+")
+
+
 def is_single_word(words):
     """
     Check if the words are valid single words without whitespace or newline characters.
@@ -8,7 +14,7 @@ def is_single_word(words):
     :rtype: bool
     """
     if isinstance(words, str):
-        return bool(words and not any(c.isspace() for c in words))
+        return _SINGLE_WORD_PATTERN.fullmatch(words) is not None
     elif isinstance(words, list):
         return all(is_single_word(word) for word in words)
     return False